@@ -0,0 +1,231 @@
+"""Compiled bulk checks for long EPC lists
+
+The kernels below are only built when numba is installed. numba is an
+optional dependency, not part of requirements.txt, so a default install runs
+without them: epc_formats_ok only rejects EPCs missing the urn:epc:id:
+prefix (with numpy) and company_prefix_spans returns None, leaving the rest
+to GS1IdentifierValidator's per-EPC checks.
+"""
+from typing import List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional; callers fall back to GS1IdentifierValidator
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional; without it only the numpy prefix check runs
+    njit = None
+
+# Kernel results per EPC
+FORMAT_INVALID, FORMAT_VALID, FORMAT_UNDECIDED = 0, 1, 2
+
+# Start offsets reported by company_prefix_spans instead of a span
+PREFIX_NONE, PREFIX_UNDECIDED = -1, -2
+
+# Batches at least this large are split across cores; smaller ones are not worth the thread start-up
+PARALLEL_THRESHOLD = 4096
+
+
+def _pack(epcs: List[str]):
+    """Encode EPCs into one concatenated uint8 buffer plus row offsets"""
+    encoded = [epc.encode('utf-8', 'surrogatepass') for epc in epcs]
+    # One concatenated buffer plus offsets, so a single long entry does not
+    # pad every row the way a fixed-width array would
+    offsets = np.zeros(len(encoded) + 1, dtype=np.intp)
+    np.cumsum(np.fromiter(map(len, encoded), dtype=np.intp, count=len(encoded)), out=offsets[1:])
+    return np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets
+
+
+def epc_formats_ok(epcs: List[str]) -> Optional[List[int]]:
+    """Check the GS1 format of many EPCs in one compiled pass
+
+    Mirrors GS1IdentifierValidator.validate_epc_format for printable ASCII
+    EPCs. Anything else is reported as FORMAT_UNDECIDED so the caller can
+    run the regular validator on it. Without numba, only EPCs missing the
+    urn:epc:id: prefix are decided, with one vectorized numpy pass over
+    the packed bytes.
+
+    Args:
+        epcs: EPC strings to check
+
+    Returns:
+        List of FORMAT_* codes, or None when numpy is not available or an
+        entry is not a string
+    """
+    if np is None or not all(isinstance(epc, str) for epc in epcs):
+        return None
+    data, offsets = _pack(epcs)
+    if njit is None:
+        # Compare the leading bytes of each entry in the packed buffer; a
+        # fixed-width array would pad every entry to the longest one
+        starts = offsets[:-1]
+        has_prefix = offsets[1:] - starts >= _PREFIX.size
+        leading = data[starts[has_prefix, None] + np.arange(_PREFIX.size)]
+        has_prefix[has_prefix] = (leading == _PREFIX).all(axis=1)
+        return np.where(has_prefix, FORMAT_UNDECIDED, FORMAT_INVALID).tolist()
+    kernel = _epcs_kernel_parallel if len(epcs) >= PARALLEL_THRESHOLD else _epcs_kernel
+    return kernel(data, offsets, _PREFIX, _SCHEMES, _SCHEME_LENGTHS).tolist()
+
+
+def company_prefix_spans(epcs: List[str]) -> Optional[List[Tuple[int, int]]]:
+    """Locate the company prefix of many EPCs in one compiled pass
+
+    Mirrors GS1IdentifierValidator.extract_company_prefix: the prefix is the
+    fifth ':'-separated field up to its first '.'. Spans are string indices,
+    so epc[start:end] is the prefix.
+
+    Args:
+        epcs: EPC strings to scan
+
+    Returns:
+        (start, end) per EPC, with start PREFIX_NONE when the EPC has no
+        prefix field, or PREFIX_UNDECIDED when non-ASCII text precedes the
+        end of the prefix. None when numba is not available or an entry is
+        not a string
+    """
+    if njit is None or not all(isinstance(epc, str) for epc in epcs):
+        return None
+    data, offsets = _pack(epcs)
+    return _prefix_spans_kernel(data, offsets).tolist()
+
+
+if np is not None:
+    _PREFIX = np.frombuffer(b'urn:epc:id:', dtype=np.uint8)
+
+if njit is not None:
+    # Scheme names that follow urn:epc:id:, indexed 0..4
+    _SCHEMES = np.frombuffer(b'sgtinsscc_sgln_grai_giai_', dtype=np.uint8).reshape(5, 5)
+    _SCHEME_LENGTHS = np.array([5, 4, 4, 4, 4], dtype=np.intp)
+
+    @njit(cache=True)
+    def _digit_run(row, start, end):
+        """Return the index after a run of ASCII digits starting at start"""
+        i = start
+        while i < end and 48 <= row[i] <= 57:
+            i += 1
+        return i
+
+    @njit(cache=True)
+    def _check_digit_ok(row, start1, end1, start2, end2):
+        """GS1 check digit over two digit runs; the last digit is the check digit"""
+        total = 0
+        pos = 0
+        # Right to left over every digit except the check digit, skipping the '.'
+        for i in range(end2 - 2, start2 - 1, -1):
+            total += (row[i] - 48) * (3 if pos % 2 == 0 else 1)
+            pos += 1
+        for i in range(end1 - 1, start1 - 1, -1):
+            total += (row[i] - 48) * (3 if pos % 2 == 0 else 1)
+            pos += 1
+        return row[end2 - 1] - 48 == (10 - (total % 10)) % 10
+
+    @njit(cache=True)
+    def _epc_format_kernel(row, length, prefix, schemes, scheme_lengths):
+        for i in range(length):
+            if row[i] < 0x21 or row[i] > 0x7e:
+                return FORMAT_UNDECIDED
+        n = prefix.shape[0]
+        if length < n:
+            return FORMAT_INVALID
+        for i in range(n):
+            if row[i] != prefix[i]:
+                return FORMAT_INVALID
+
+        scheme = -1
+        for s in range(schemes.shape[0]):
+            slen = scheme_lengths[s]
+            if n + slen >= length or row[n + slen] != 58:  # ':'
+                continue
+            matched = True
+            for i in range(slen):
+                if row[n + i] != schemes[s, i]:
+                    matched = False
+                    break
+            if matched:
+                scheme = s
+                break
+        if scheme < 0:
+            return FORMAT_INVALID
+
+        start1 = n + scheme_lengths[scheme] + 1
+        end1 = _digit_run(row, start1, length)
+        if end1 == start1 or end1 >= length or row[end1] != 46:  # '.'
+            return FORMAT_INVALID
+        start2 = end1 + 1
+        end2 = _digit_run(row, start2, length)
+        if end2 == start2:
+            return FORMAT_INVALID
+
+        if scheme == 0:  # sgtin: <prefix>.<item>.<serial of 1-20 alphanumerics>
+            if end2 >= length or row[end2] != 46:
+                return FORMAT_INVALID
+            serial_len = length - end2 - 1
+            if serial_len < 1 or serial_len > 20:
+                return FORMAT_INVALID
+            for i in range(end2 + 1, length):
+                c = row[i]
+                if not (48 <= c <= 57 or 65 <= c <= 90 or 97 <= c <= 122):
+                    return FORMAT_INVALID
+            return FORMAT_VALID
+
+        if end2 != length:
+            return FORMAT_INVALID
+        if scheme == 1:  # sscc: 17 digits in total
+            return FORMAT_VALID if (end1 - start1) + (end2 - start2) == 17 else FORMAT_INVALID
+        if scheme == 2:  # sgln: GLN check digit
+            return FORMAT_VALID if _check_digit_ok(row, start1, end1, start2, end2) else FORMAT_INVALID
+        return FORMAT_VALID  # grai / giai
+
+    @njit(cache=True)
+    def _prefix_spans_kernel(data, offsets):
+        n = offsets.shape[0] - 1
+        out = np.empty((n, 2), dtype=np.intp)
+        for r in range(n):
+            start, end = offsets[r], offsets[r + 1]
+            out[r, 0] = PREFIX_NONE
+            out[r, 1] = PREFIX_NONE
+            # Byte offsets only equal string indices while the text is ASCII
+            colons = 0
+            i = start
+            while i < end and colons < 4:
+                if data[i] >= 0x80:
+                    break
+                if data[i] == 58:  # ':'
+                    colons += 1
+                i += 1
+            if i < end and data[i] >= 0x80:
+                out[r, 0] = PREFIX_UNDECIDED
+                continue
+            if colons < 4:
+                continue
+            j = i
+            while j < end and data[j] != 58 and data[j] != 46:  # up to ':' or '.'
+                if data[j] >= 0x80:
+                    break
+                j += 1
+            if j < end and data[j] >= 0x80:
+                out[r, 0] = PREFIX_UNDECIDED
+                continue
+            out[r, 0] = i - start
+            out[r, 1] = j - start
+        return out
+
+    @njit(cache=True)
+    def _epcs_kernel(data, offsets, prefix, schemes, scheme_lengths):
+        n = offsets.shape[0] - 1
+        out = np.empty(n, dtype=np.int8)
+        for r in range(n):
+            start, end = offsets[r], offsets[r + 1]
+            out[r] = _epc_format_kernel(data[start:end], end - start, prefix, schemes, scheme_lengths)
+        return out
+
+    @njit(cache=True, parallel=True)
+    def _epcs_kernel_parallel(data, offsets, prefix, schemes, scheme_lengths):
+        n = offsets.shape[0] - 1
+        out = np.empty(n, dtype=np.int8)
+        for r in prange(n):
+            start, end = offsets[r], offsets[r + 1]
+            out[r] = _epc_format_kernel(data[start:end], end - start, prefix, schemes, scheme_lengths)
+        return out
@@ -1,14 +1,64 @@
 from datetime import datetime
+from itertools import chain
 import re
-from typing import Dict, List, Set
+from typing import Dict, List, Optional, Set
 from .utils import validate_date_format, add_error, validate_dates_order
 from .identifier_validation import GS1IdentifierValidator
+from .epc_kernels import epc_formats_ok, FORMAT_UNDECIDED
+
+try:
+    import numpy as np
+except ImportError:  # numpy only speeds up large EPC lists; the scalar loop is used without it
+    np = None
+
+# Timezone offsets are +HH:MM / -HH:MM in 15-minute increments
+_TZ_RE = re.compile(r'^[+-]\d{2}:\d{2}$')
+_VALID_MINUTES = frozenset({0, 15, 30, 45})
+
+# Upper bound on memoized EPC results before the caches are reset
+_EPC_CACHE_SIZE = 65536
+
+# Below this many EPCs in one event the plain per-EPC loop is cheaper than the array setup
+_BULK_EPC_THRESHOLD = 64
+
+# Per-EPC outcome codes used by the bulk path
+_EPC_OK, _EPC_BAD_FORMAT, _EPC_BAD_PREFIX = 0, 1, 2
+
+# Marks an EPC whose company prefix was not supplied by the parser
+_PREFIX_NOT_EXTRACTED = object()
+
+
+def _fast_check_event_time(value: str) -> bool:
+    """Cheap check for YYYY-MM-DDTHH:MM:SS[.f]Z timestamps
+
+    Returns True only when the value is definitely valid; anything else
+    should go through the strptime path so error reporting is unchanged.
+    """
+    # isdigit alone accepts non-ASCII digits such as '²', which strptime's %f rejects
+    if not value.isascii():
+        return False
+    length = len(value)
+    if length != 20 and not (22 <= length <= 27 and value[19] == '.'):
+        return False
+    if (value[-1] != 'Z' or value[4] != '-' or value[7] != '-' or value[10] != 'T'
+            or value[13] != ':' or value[16] != ':'):
+        return False
+    if not (value[0:4].isdigit() and value[5:7].isdigit() and value[8:10].isdigit()
+            and value[11:13].isdigit() and value[14:16].isdigit() and value[17:19].isdigit()
+            and (length == 20 or value[20:-1].isdigit())):
+        return False
+    try:
+        datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                 int(value[11:13]), int(value[14:16]), int(value[17:19]))
+    except ValueError:
+        return False
+    return True
 
 class EPCISEventValidator:
     """Validator for individual EPCIS events"""
 
     # Valid business steps from CBV (Core Business Vocabulary)
-    VALID_BIZ_STEPS = {
+    VALID_BIZ_STEPS = frozenset({
         'accepting', 'arriving', 'collecting', 'commissioning', 'consigning',
         'creating_class_instance', 'cycle_counting', 'decommissioning',
         'departing', 'destroying', 'dispensing', 'encoding', 'entering_exiting',
@@ -17,16 +67,20 @@ class EPCISEventValidator:
         'repairing', 'replacing', 'reserving', 'retail_selling', 'shipping',
         'staging_outbound', 'stock_taking', 'stocking', 'storing', 'transporting',
         'unloading', 'void_shipping'
-    }
+    })
 
     # Valid dispositions from CBV
-    VALID_DISPOSITIONS = {
+    VALID_DISPOSITIONS = frozenset({
         'active', 'container_closed', 'damaged', 'destroyed', 'dispensed', 
         'disposed', 'encoded', 'expired', 'in_progress', 'in_transit', 'inactive', 
         'no_pedigree_match', 'non_sellable_other', 'partially_dispensed', 'recalled', 
         'reserved', 'retail_sold', 'returned', 'sellable_accessible', 
         'sellable_not_accessible', 'stolen', 'unknown', 'available', 'unavailable'
-    }
+    })
+
+    # Bare and fully qualified CBV URN forms, so the common case is a single lookup
+    _VALID_BIZ_STEP_FULL = VALID_BIZ_STEPS | {f'urn:epcglobal:cbv:bizstep:{s}' for s in VALID_BIZ_STEPS}
+    _VALID_DISPOSITION_FULL = VALID_DISPOSITIONS | {f'urn:epcglobal:cbv:disp:{d}' for d in VALID_DISPOSITIONS}
 
     # Required fields for each event type
     REQUIRED_FIELDS = {
@@ -47,8 +101,39 @@ class EPCISEventValidator:
         'shipping': ['urn:epcglobal:cbv:btt:po', 'urn:epcglobal:cbv:btt:desadv']
     }
 
+    # Frozen views of the shipping tables for a single subset test when nothing is missing;
+    # the lists above still drive the order errors are reported in
+    _REQUIRED_SHIPPING_TXNS = frozenset(REQUIRED_TRANSACTION_TYPES['shipping'])
+    _REQUIRED_SHIPPING_PARTIES = {k: frozenset(v) for k, v in REQUIRED_SHIPPING_FIELDS.items()}
+
+    # Required ILMD fields for commissioning events: (field, key as it may appear in the ILMD, type)
+    _ILMD_REQUIRED_FIELDS = (
+        ('lotNumber', 'lotNumber', str),
+        ('itemExpirationDate', 'cbvmda:itemExpirationDate', str),
+    )
+
     def __init__(self):
         self.gs1_validator = GS1IdentifierValidator()
+        # EPCs repeat across events (commissioning, packing, shipping, ...), so
+        # memoize the pure per-EPC results: format validity and company prefix
+        self._epc_fmt_cache: Dict[str, bool] = {}
+        self._epc_prefix_cache: Dict[str, Optional[str]] = {}
+
+        # Per-event checks in reporting order, bound once instead of looked up per event.
+        # EPC, bizStep and ILMD validation are called directly between the groups
+        # since they take extra arguments.
+        self._pre_epc_validators = (
+            self._validate_required_fields,
+            self._validate_event_time,
+        )
+        self._post_epc_validators = (
+            self._validate_disposition,
+            self._validate_location_identifiers,
+        )
+        # Additional validations for specific event types
+        self._event_type_validators = {
+            'AggregationEvent': self._validate_aggregation_event,
+        }
 
     def validate_event(self, event: Dict, authorized_companies: Set[str]) -> List[Dict]:
         """Validate an individual EPCIS event
@@ -72,30 +157,23 @@ class EPCISEventValidator:
             add_error(errors, 'structure', 'error', "Empty event found")
             return errors
 
-        # Validate required fields
-        self._validate_required_fields(event, errors)
-        
-        # Validate event time and timezone
-        self._validate_event_time(event, errors)
-        
-        # Validate EPCs
+        # Required fields and event time/timezone
+        for validate in self._pre_epc_validators:
+            validate(event, errors)
+
         self._validate_epcs(event, authorized_companies, errors)
-        
-        # Validate business step and disposition
-        self._validate_biz_step(event, errors)
-        self._validate_disposition(event, errors)
-        
-        # Validate location identifiers
-        self._validate_location_identifiers(event, errors)
-        
-        # Validate ILMD data for commissioning events
-        self._validate_ilmd_data(event, errors)
-        
-        # Additional validations for specific event types
-        event_type = event.get('eventType')
-        if event_type == 'AggregationEvent':
-            self._validate_aggregation_event(event, errors)
-        elif event.get('bizStep', '').endswith('shipping'):
+
+        # Business step, disposition, location identifiers and commissioning ILMD data
+        biz_step = event.get('bizStep', '')
+        self._validate_biz_step(biz_step, errors)
+        for validate in self._post_epc_validators:
+            validate(event, errors)
+        self._validate_ilmd_data(event, biz_step, errors)
+
+        type_validator = self._event_type_validators.get(event.get('eventType'))
+        if type_validator is not None:
+            type_validator(event, errors)
+        elif biz_step.endswith('shipping'):
             self._validate_shipping_event(event, errors)
 
         return errors
@@ -108,20 +186,21 @@ class EPCISEventValidator:
             biz_step = event.get('bizStep')
             if not isinstance(biz_step, str) or not biz_step.strip():
                 add_error(errors, 'field', 'error', "Missing required field: bizStep")
-        if event_type in self.REQUIRED_FIELDS:
-            for field in self.REQUIRED_FIELDS[event_type]:
+        required_fields = self.REQUIRED_FIELDS.get(event_type)
+        if required_fields:
+            for field in [f for f in required_fields if not event.get(f)]:
                 if field == 'parentID' and event_type == 'AggregationEvent':
-                    if event.get('action') == 'ADD' and not event.get(field):
+                    if event.get('action') == 'ADD':
                         add_error(errors, 'field', 'error', 
                                 f"parentID required for ADD AggregationEvent")
-                elif not event.get(field):
+                else:
                     add_error(errors, 'field', 'error',
                             f"Missing required field for {event_type}: {field}")
 
     def _validate_event_time(self, event: Dict, errors: List[Dict]):
         """Validate event time format and timezone"""
         event_time = event.get('eventTime')
-        if event_time:
+        if event_time and not _fast_check_event_time(event_time):
             try:
                 datetime.strptime(event_time, "%Y-%m-%dT%H:%M:%S.%fZ")
             except ValueError:
@@ -138,51 +217,112 @@ class EPCISEventValidator:
 
     def _validate_epcs(self, event: Dict, authorized_companies: Set[str], errors: List[Dict]):
         """Validate EPCs in the event"""
-        # First check if we have detailed EPC data with line numbers
-        detailed_checked = False
-        if 'epcList_detailed' in event:
-            detailed_checked = True
-            for epc_entry in event['epcList_detailed']:
-                epc = epc_entry.get('value', '')
-                line_number = epc_entry.get('line_number', 0)
-                
-                if not self.gs1_validator.validate_epc_format(epc):
-                    add_error(errors, 'field', 'error',
-                            f"Invalid EPC format: {epc}", line_number=line_number)
-                elif not self.gs1_validator.validate_company_prefix(epc, authorized_companies):
-                    add_error(errors, 'field', 'error',
-                            f"Unauthorized company prefix in EPC: {epc}", line_number=line_number)
-        # Same for childEPCs
-        if 'childEPCs_detailed' in event:
-            detailed_checked = True
-            for epc_entry in event['childEPCs_detailed']:
-                epc = epc_entry.get('value', '')
-                line_number = epc_entry.get('line_number', 0)
-                
-                if not self.gs1_validator.validate_epc_format(epc):
-                    add_error(errors, 'field', 'error',
-                            f"Invalid EPC format: {epc}", line_number=line_number)
-                elif not self.gs1_validator.validate_company_prefix(epc, authorized_companies):
-                    add_error(errors, 'field', 'error',
-                            f"Unauthorized company prefix in EPC: {epc}", line_number=line_number)
+        # Prefer detailed EPC data with per-EPC line numbers when the parser provided it
+        if 'epcList_detailed' in event or 'childEPCs_detailed' in event:
+            entries = list(chain(event.get('epcList_detailed', ()), event.get('childEPCs_detailed', ())))
+            if np is not None and len(entries) >= _BULK_EPC_THRESHOLD:
+                self._bulk_validate_epcs([e.get('value', '') for e in entries], authorized_companies,
+                                         [e.get('line_number', 0) for e in entries], errors)
+                return
+            for epc_entry in entries:
+                self._validate_epc(epc_entry.get('value', ''), authorized_companies,
+                                   epc_entry.get('line_number', 0), errors,
+                                   epc_entry.get('company', _PREFIX_NOT_EXTRACTED))
+            return
+
         # Fallback to the old way (no line numbers) for backward compatibility
-        epcs = event.get('epcList', []) + event.get('childEPCs', [])
-        if isinstance(epcs, list) and not detailed_checked:
-            for epc in epcs:
-                # Default event line number for backward compatibility
-                line_number = event.get('_line_number', 0)
-                if not self.gs1_validator.validate_epc_format(epc):
-                    add_error(errors, 'field', 'error',
-                            f"Invalid EPC format: {epc}", line_number=line_number)
-                elif not self.gs1_validator.validate_company_prefix(epc, authorized_companies):
-                    add_error(errors, 'field', 'error',
-                            f"Unauthorized company prefix in EPC: {epc}", line_number=line_number)
+        line_number = event.get('_line_number', 0)
+        epc_list = event.get('epcList', ())
+        child_epcs = event.get('childEPCs', ())
+        if np is not None and len(epc_list) + len(child_epcs) >= _BULK_EPC_THRESHOLD:
+            epcs = list(chain(epc_list, child_epcs))
+            self._bulk_validate_epcs(epcs, authorized_companies, [line_number] * len(epcs), errors)
+            return
+        for epc in chain(epc_list, child_epcs):
+            self._validate_epc(epc, authorized_companies, line_number, errors)
+
+    def _bulk_validate_epcs(self, epcs: List[str], authorized_companies: Set[str],
+                            line_numbers: List[int], errors: List[Dict]):
+        """Validate a large EPC list, reporting errors in the same order as _validate_epc
+
+        Each distinct EPC is checked once, with the format check compiled by
+        numba when it is installed; numpy maps the outcomes back onto the full
+        list so only the failing entries are visited again in Python.
+        """
+        codes: Dict[str, int] = {}
+        inverse = np.fromiter((codes.setdefault(epc, len(codes)) for epc in epcs),
+                              dtype=np.intp, count=len(epcs))
+        distinct = list(codes)
+        formats = epc_formats_ok(distinct) or [FORMAT_UNDECIDED] * len(distinct)
+        outcomes = np.fromiter(
+            (self._epc_outcome(epc, authorized_companies, None if fmt == FORMAT_UNDECIDED else bool(fmt))
+             for epc, fmt in zip(distinct, formats)),
+            dtype=np.int8, count=len(distinct))[inverse]
+
+        for i in np.flatnonzero(outcomes).tolist():
+            if outcomes[i] == _EPC_BAD_FORMAT:
+                add_error(errors, 'field', 'error',
+                        f"Invalid EPC format: {epcs[i]}", line_number=line_numbers[i])
+            else:
+                add_error(errors, 'field', 'error',
+                        f"Unauthorized company prefix in EPC: {epcs[i]}", line_number=line_numbers[i])
+
+    def _epc_outcome(self, epc: str, authorized_companies: Set[str], format_ok: Optional[bool] = None) -> int:
+        """Classify an EPC as ok, bad format or unauthorized prefix"""
+        if format_ok is None:
+            format_ok = self._epc_format_ok(epc)
+        if not format_ok:
+            return _EPC_BAD_FORMAT
+        if not self._epc_prefix_ok(epc, authorized_companies):
+            return _EPC_BAD_PREFIX
+        return _EPC_OK
+
+    def _validate_epc(self, epc: str, authorized_companies: Set[str], line_number: int, errors: List[Dict],
+                      company_prefix=_PREFIX_NOT_EXTRACTED):
+        """Validate a single EPC's format and company prefix"""
+        if not self._epc_format_ok(epc):
+            add_error(errors, 'field', 'error',
+                    f"Invalid EPC format: {epc}", line_number=line_number)
+        elif not self._epc_prefix_ok(epc, authorized_companies, company_prefix):
+            add_error(errors, 'field', 'error',
+                    f"Unauthorized company prefix in EPC: {epc}", line_number=line_number)
+
+    def _epc_format_ok(self, epc: str) -> bool:
+        """Cached wrapper around GS1IdentifierValidator.validate_epc_format"""
+        cache = self._epc_fmt_cache
+        ok = cache.get(epc)
+        if ok is None:
+            if len(cache) >= _EPC_CACHE_SIZE:
+                cache.clear()
+            ok = cache[epc] = self.gs1_validator.validate_epc_format(epc)
+        return ok
 
-    def _validate_biz_step(self, event: Dict, errors: List[Dict]):
+    def _epc_prefix_ok(self, epc: str, authorized_companies: Set[str],
+                       company_prefix=_PREFIX_NOT_EXTRACTED) -> bool:
+        """Cached equivalent of GS1IdentifierValidator.validate_company_prefix
+
+        Only the extracted prefix is cached; membership is checked against the
+        caller's set each time since it differs between documents. A prefix
+        the parser already extracted is used as is.
+        """
+        if not authorized_companies:
+            return False
+        if company_prefix is _PREFIX_NOT_EXTRACTED:
+            cache = self._epc_prefix_cache
+            if epc in cache:
+                company_prefix = cache[epc]
+            else:
+                if len(cache) >= _EPC_CACHE_SIZE:
+                    cache.clear()
+                company_prefix = cache[epc] = self.gs1_validator.extract_company_prefix(epc)
+        return self.gs1_validator.is_authorized_prefix(company_prefix, authorized_companies)
+
+    def _validate_biz_step(self, biz_step: str, errors: List[Dict]):
         """Validate business step"""
-        biz_step = event.get('bizStep', '')
         if isinstance(biz_step, str) and biz_step:
-            step = biz_step.split(':')[-1]
+            if biz_step in self._VALID_BIZ_STEP_FULL:
+                return
+            step = biz_step.rpartition(':')[2]
             if step not in self.VALID_BIZ_STEPS:
                 add_error(errors, 'field', 'error',
                         f"Invalid business step: {step}")
@@ -194,7 +334,9 @@ class EPCISEventValidator:
         """Validate disposition"""
         disposition = event.get('disposition', '')
         if isinstance(disposition, str) and disposition:
-            disp = disposition.split(':')[-1]
+            if disposition in self._VALID_DISPOSITION_FULL:
+                return
+            disp = disposition.rpartition(':')[2]
             if disp not in self.VALID_DISPOSITIONS:
                 add_error(errors, 'field', 'error',
                         f"Invalid disposition: {disp}")
@@ -216,19 +358,13 @@ class EPCISEventValidator:
                         add_error(errors, 'format', 'error',
                                 f"Invalid {location_type} identifier format: must be SGLN")
 
-    def _validate_ilmd_data(self, event: Dict, errors: List[Dict]):
+    def _validate_ilmd_data(self, event: Dict, biz_step: str, errors: List[Dict]):
         """Validate ILMD data in commissioning events"""
-        if event.get('bizStep', '').endswith('commissioning') and 'ilmd' in event:
+        if biz_step.endswith('commissioning') and 'ilmd' in event:
             ilmd = event['ilmd']
             
-            required_fields = {
-                'lotNumber': str,
-                'itemExpirationDate': str
-            }
-            
-            for field, field_type in required_fields.items():
+            for field, field_path, field_type in self._ILMD_REQUIRED_FIELDS:
                 value = ilmd.get(field)
-                field_path = f"cbvmda:{field}" if field != 'lotNumber' else field
                 full_value = ilmd.get(field_path, value)
                 
                 if not full_value:
@@ -265,10 +401,12 @@ class EPCISEventValidator:
         biz_transactions = event.get('bizTransactionList', [])
         found_types = {bt.get('type') for bt in biz_transactions if isinstance(bt, dict)}
         
-        for required_type in self.REQUIRED_TRANSACTION_TYPES['shipping']:
-            if required_type not in found_types:
-                add_error(errors, 'field', 'error',
-                        f"Missing required transaction type in shipping event: {required_type}")
+        missing = self._REQUIRED_SHIPPING_TXNS - found_types
+        if missing:
+            for required_type in self.REQUIRED_TRANSACTION_TYPES['shipping']:
+                if required_type in missing:
+                    add_error(errors, 'field', 'error',
+                            f"Missing required transaction type in shipping event: {required_type}")
 
         # Validate source/destination lists
         extension = event.get('extension', {})
@@ -277,7 +415,8 @@ class EPCISEventValidator:
             found_types = {item.get('type', '').split(':')[-1] 
                          for item in type_list 
                          if isinstance(item, dict)}
-            
+            if self._REQUIRED_SHIPPING_PARTIES[list_type] <= found_types:
+                continue
             for required_type in required_types:
                 if required_type not in found_types:
                     add_error(errors, 'field', 'error',
@@ -287,9 +426,9 @@ class EPCISEventValidator:
     def _is_valid_timezone(tz: str) -> bool:
         """Validate timezone offset format"""
         # Allow offsets in 15-minute increments
-        if not re.match(r'^[+-]\d{2}:\d{2}$', tz):
+        if not _TZ_RE.match(tz):
             return False
         hours = int(tz[1:3]); minutes = int(tz[4:6])
-        return 0 <= hours <= 14 and minutes in {0, 15, 30, 45}
+        return 0 <= hours <= 14 and minutes in _VALID_MINUTES
     
 event_validation = EPCISEventValidator()
\ No newline at end of file
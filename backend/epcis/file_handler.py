@@ -1,18 +1,37 @@
 import os
 import json
-import xml.etree.ElementTree as ET
+import lxml.etree as ET
 from typing import Dict, List, Tuple, Any, Optional
 import logging
 from pathlib import Path
 
+from .utils import loads_json
+
 logger = logging.getLogger(__name__)
 
 class EPCISFileHandler:
     """Handler for EPCIS file operations"""
+
+    # Event fields read from a direct child element's text: (output key, XML tag)
+    _XML_EVENT_TEXT_FIELDS = (
+        ("time", "eventTime"),
+        ("timezone_offset", "eventTimeZoneOffset"),
+        ("action", "action"),
+        ("biz_step", "bizStep"),
+        ("disposition", "disposition"),
+    )
     
     def __init__(self, storage_path: str = "storage"):
         self.storage_path = storage_path
-        os.makedirs(storage_path, exist_ok=True)
+        # Directories already created by this handler, to skip repeated makedirs calls
+        self._ensured_dirs = set()
+        self._ensure_dir(storage_path)
+
+    def _ensure_dir(self, path: str):
+        """Create a directory once per handler"""
+        if path not in self._ensured_dirs:
+            os.makedirs(path, exist_ok=True)
+            self._ensured_dirs.add(path)
     
     def store_file(self, file_content: bytes, file_name: str, supplier_id: str) -> str:
         """Store an EPCIS file in the storage directory
@@ -27,11 +46,18 @@ class EPCISFileHandler:
         """
         # Create supplier directory if it doesn't exist
         supplier_dir = os.path.join(self.storage_path, supplier_id)
-        os.makedirs(supplier_dir, exist_ok=True)
+        self._ensure_dir(supplier_dir)
         
         # Save file
         file_path = os.path.join(supplier_dir, file_name)
-        with open(file_path, 'wb') as f:
+        try:
+            f = open(file_path, 'wb')
+        except FileNotFoundError:
+            # Directory was removed since we created it
+            self._ensured_dirs.discard(supplier_dir)
+            self._ensure_dir(supplier_dir)
+            f = open(file_path, 'wb')
+        with f:
             f.write(file_content)
             
         return file_path
@@ -48,9 +74,10 @@ class EPCISFileHandler:
         warnings = []
         
         try:
-            if file_path.lower().endswith('.xml'):
+            ext = os.path.splitext(file_path)[1].lower()
+            if ext == '.xml':
                 return self._parse_xml(file_path, warnings)
-            elif file_path.lower().endswith('.json'):
+            elif ext == '.json':
                 return self._parse_json(file_path, warnings)
             else:
                 raise ValueError("Unsupported file format")
@@ -74,30 +101,35 @@ class EPCISFileHandler:
             Tuple of (parsed data, warnings)
         """
         try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            
-            # Remove XML namespace for easier parsing
-            for elem in root.iter():
-                if '}' in elem.tag:
-                    elem.tag = elem.tag.split('}', 1)[1]
-            
-            # Extract events
-            events = []
-            for event_elem in root.findall('.//ObjectEvent') + root.findall('.//AggregationEvent'):
+            # findall() ordering: all ObjectEvents first, then AggregationEvents
+            events_by_tag = {"ObjectEvent": [], "AggregationEvent": []}
+
+            # Stream the document, letting libxml2 pick out event elements in any namespace
+            context = ET.iterparse(file_path, events=("end",), tag=("{*}ObjectEvent", "{*}AggregationEvent"))
+            for _, event_elem in context:
+                if event_elem.getparent() is None:
+                    continue
+                # Remove XML namespace for easier parsing
+                for elem in event_elem.iter(ET.Element):
+                    if '}' in elem.tag:
+                        elem.tag = elem.tag.split('}', 1)[1]
                 try:
-                    event = self._parse_xml_event(event_elem)
-                    events.append(event)
+                    events_by_tag[event_elem.tag].append(self._parse_xml_event(event_elem))
                 except Exception as e:
                     warnings.append({
                         "level": "warning",
                         "message": f"Failed to parse event: {str(e)}"
                     })
-            
+                # Free the parsed event and anything before it
+                event_elem.clear(keep_tail=True)
+                parent = event_elem.getparent()
+                while event_elem.getprevious() is not None:
+                    del parent[0]
+
             return {
                 "format": "xml",
-                "events": events,
-                "schema_version": root.get("schemaVersion", "1.2")
+                "events": events_by_tag["ObjectEvent"] + events_by_tag["AggregationEvent"],
+                "schema_version": context.root.get("schemaVersion", "1.2")
             }, warnings
             
         except ET.ParseError as e:
@@ -112,27 +144,28 @@ class EPCISFileHandler:
         Returns:
             Dict with parsed event data
         """
-        event = {
-            "type": event_elem.tag,
-            "time": event_elem.findtext("eventTime"),
-            "timezone_offset": event_elem.findtext("eventTimeZoneOffset"),
-            "action": event_elem.findtext("action"),
-            "biz_step": event_elem.findtext("bizStep"),
-            "disposition": event_elem.findtext("disposition")
-        }
+        # Index direct children in one pass; the first occurrence of a tag wins, as with find()
+        children = {}
+        for child in event_elem:
+            children.setdefault(child.tag, child)
+
+        event = {"type": event_elem.tag}
+        for key, tag in self._XML_EVENT_TEXT_FIELDS:
+            child = children.get(tag)
+            event[key] = None if child is None else (child.text or '')
         
         # Extract EPCs
-        epc_list = event_elem.find("epcList")
+        epc_list = children.get("epcList")
         if epc_list is not None:
             event["epcs"] = [epc.text for epc in epc_list.findall("epc")]
         
         # Extract business location
-        biz_location = event_elem.find("bizLocation")
+        biz_location = children.get("bizLocation")
         if biz_location is not None:
             event["biz_location"] = biz_location.findtext("id")
         
         # Extract read point
-        read_point = event_elem.find("readPoint")
+        read_point = children.get("readPoint")
         if read_point is not None:
             event["read_point"] = read_point.findtext("id")
         
@@ -149,8 +182,8 @@ class EPCISFileHandler:
             Tuple of (parsed data, warnings)
         """
         try:
-            with open(file_path, 'r') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                data = loads_json(f.read())
             
             if not isinstance(data, dict):
                 raise ValueError("Invalid JSON format: root must be an object")
@@ -209,12 +242,20 @@ class EPCISFileHandler:
             # Create archive directory if it doesn't exist
             file_dir = os.path.dirname(file_path)
             archive_dir = os.path.join(file_dir, "archived")
-            os.makedirs(archive_dir, exist_ok=True)
+            self._ensure_dir(archive_dir)
             
             # Move file to archive
             file_name = os.path.basename(file_path)
             archive_path = os.path.join(archive_dir, file_name)
-            os.rename(file_path, archive_path)
+            try:
+                os.rename(file_path, archive_path)
+            except FileNotFoundError:
+                if os.path.isdir(archive_dir):
+                    raise
+                # Archive directory was removed since we created it
+                self._ensured_dirs.discard(archive_dir)
+                self._ensure_dir(archive_dir)
+                os.rename(file_path, archive_path)
             
             return archive_path
             
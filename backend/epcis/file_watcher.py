@@ -2,6 +2,7 @@ import os
 import time
 import logging
 import asyncio
+import threading
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 from typing import Dict, Any, Optional
@@ -11,14 +12,58 @@ from .file_handler import EPCISFileHandler
 
 logger = logging.getLogger(__name__)
 
+def _wait_for_stable(path: str, interval: float = 0.05, stable_rounds: int = 2, timeout: float = 5.0) -> bool:
+    """Wait until a file's size stops changing so we don't read a partial write
+
+    Args:
+        path: File to watch
+        interval: Seconds between size checks
+        stable_rounds: Number of consecutive unchanged, non-empty checks required
+        timeout: Maximum seconds to wait
+
+    Returns:
+        True if the size settled, False if the timeout expired first
+    """
+    deadline = time.monotonic() + timeout
+    last_size = -1
+    unchanged = 0
+    while True:
+        size = os.path.getsize(path)
+        if size == last_size and size > 0:
+            unchanged += 1
+            if unchanged >= stable_rounds:
+                return True
+        else:
+            unchanged = 0
+        last_size = size
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+async def _drain_tasks():
+    """Wait for every other task on the running loop to finish"""
+    tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+    await asyncio.gather(*tasks, return_exceptions=True)
+
 class EPCISFileEventHandler(FileSystemEventHandler):
     """Watchdog event handler for EPCIS files dropped in watch directories"""
+
+    SUPPORTED_EXTENSIONS = frozenset({'.xml', '.json'})
     
-    def __init__(self, submission_service: SubmissionService, supplier_mapping: Dict[str, str]):
+    def __init__(self, submission_service: SubmissionService, supplier_mapping: Dict[str, str], max_concurrency: int = 4):
         self.submission_service = submission_service
         self.supplier_mapping = supplier_mapping
         self.file_handler = EPCISFileHandler()
         self.processing_files = set()
+        self.max_concurrency = max_concurrency
+        # Long-running loop files are submitted to; without one each file gets its own asyncio.run
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def attach_loop(self, loop: Optional[asyncio.AbstractEventLoop]):
+        """Process files on the given event loop instead of blocking the watchdog thread"""
+        self._loop = loop
+        self._semaphore = None
     
     def on_created(self, event):
         """Handle file creation events"""
@@ -28,7 +73,7 @@ class EPCISFileEventHandler(FileSystemEventHandler):
         file_path = event.src_path
         
         # Check if this is an XML or JSON file
-        if not (file_path.lower().endswith('.xml') or file_path.lower().endswith('.json')):
+        if os.path.splitext(file_path)[1].lower() not in self.SUPPORTED_EXTENSIONS:
             return
             
         # Check if the file is in a supplier directory
@@ -50,18 +95,34 @@ class EPCISFileEventHandler(FileSystemEventHandler):
             self.processing_files.add(file_path)
             logger.info(f"New EPCIS file detected: {file_path} for supplier: {supplier_dir}")
             
-            try:
-                # Wait a moment to ensure the file is fully written
-                time.sleep(1)
-                
-                # Process the file
-                asyncio.run(self._process_file(file_path, supplier_id))
-                
-            except Exception as e:
-                logger.error(f"Error processing file {file_path}: {e}")
-            finally:
-                # Remove from processing set
-                self.processing_files.discard(file_path)
+            coro = self._process_when_ready(file_path, supplier_id)
+            if self._loop is not None:
+                asyncio.run_coroutine_threadsafe(coro, self._loop)
+            else:
+                asyncio.run(coro)
+
+    async def _process_when_ready(self, file_path: str, supplier_id: str):
+        """Wait for the file to be fully written, then process it within the concurrency limit"""
+        try:
+            loop = asyncio.get_running_loop()
+            if not await loop.run_in_executor(None, _wait_for_stable, file_path):
+                logger.warning(f"File {file_path} still changing after timeout, processing anyway")
+
+            if self._loop is None:
+                await self._process_file(file_path, supplier_id)
+                return
+
+            # Created lazily so it belongs to the watcher's loop
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            async with self._semaphore:
+                await self._process_file(file_path, supplier_id)
+
+        except Exception as e:
+            logger.error(f"Error processing file {file_path}: {e}")
+        finally:
+            # Remove from processing set
+            self.processing_files.discard(file_path)
     
     async def _process_file(self, file_path: str, supplier_id: str):
         """Process an EPCIS file"""
@@ -108,7 +169,8 @@ class EPCISFileWatcher:
         submission_service: SubmissionService,
         watch_dir: str,
         supplier_mapping: Dict[str, str],
-        poll_interval: float = 1.0
+        poll_interval: float = 1.0,
+        max_concurrency: int = 4
     ):
         self.submission_service = submission_service
         self.watch_dir = watch_dir
@@ -120,13 +182,22 @@ class EPCISFileWatcher:
         
         # Initialize watchdog observer and event handler
         self.observer = None
-        self.event_handler = EPCISFileEventHandler(submission_service, supplier_mapping)
+        self.event_handler = EPCISFileEventHandler(submission_service, supplier_mapping, max_concurrency)
+
+        # Event loop shared by all file submissions, run in a background thread
+        self._loop = None
+        self._loop_thread = None
     
     def start(self):
         """Start watching for file events"""
         try:
             logger.info(f"Starting EPCIS file watcher on directory: {self.watch_dir}")
             
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name="epcis-file-watcher", daemon=True)
+            self._loop_thread.start()
+            self.event_handler.attach_loop(self._loop)
+            
             self.observer = Observer()
             self.observer.schedule(self.event_handler, self.watch_dir, recursive=True)
             self.observer.start()
@@ -141,4 +212,13 @@ class EPCISFileWatcher:
         if self.observer:
             self.observer.stop()
             self.observer.join()
-            logger.info("File watcher stopped")
\ No newline at end of file
+            logger.info("File watcher stopped")
+        if self._loop:
+            # Let in-flight submissions finish before shutting the loop down
+            asyncio.run_coroutine_threadsafe(_drain_tasks(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join()
+            self._loop.close()
+            self.event_handler.attach_loop(None)
+            self._loop = None
+            self._loop_thread = None
\ No newline at end of file
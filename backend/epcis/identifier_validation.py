@@ -1,5 +1,75 @@
 import re
-from typing import Optional
+import sys
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+# Compiled GS1 identifier patterns. EPC URNs are ASCII, so \d only matches 0-9.
+# Updated SGTIN pattern to properly validate SGTIN-198 format:
+# <CompanyPrefix>.<ItemReference>.<SerialNumber>
+# Where SerialNumber must be 1-20 alphanumeric characters
+_SGTIN_RE = re.compile(r'^urn:epc:id:sgtin:(\d+)\.(\d+)\.([A-Za-z0-9]{1,20})$', re.ASCII)
+_SSCC_RE = re.compile(r'^urn:epc:id:sscc:(\d+)\.(\d+)$', re.ASCII)
+_SGLN_RE = re.compile(r'^urn:epc:id:sgln:(\d+)\.(\d+)$', re.ASCII)
+_GRAI_RE = re.compile(r'^urn:epc:id:grai:(\d+)\.(\d+)$', re.ASCII)
+_GIAI_RE = re.compile(r'^urn:epc:id:giai:(\d+)\.(\d+)$', re.ASCII)
+
+_EPC_URN_PREFIX = 'urn:epc:id:'
+_EPC_CACHE_SIZE = 131072
+# Scheme keyword after urn:epc:id: -> (interned type name, whether a third, serial field follows)
+_EPC_SCHEMES = {
+    scheme: (sys.intern(scheme), has_serial)
+    for scheme, has_serial in (('sgtin', True), ('sscc', False), ('sgln', False), ('grai', False), ('giai', False))
+}
+
+
+def _is_digits(value: str) -> bool:
+    """True for a non-empty run of ASCII digits (str.isdigit alone accepts e.g. '²')"""
+    return value.isascii() and value.isdigit()
+
+
+def _is_alphanumeric(value: str) -> bool:
+    """True for a non-empty run of [A-Za-z0-9]; for ASCII text isalnum is exactly that class"""
+    return value.isascii() and value.isalnum()
+
+
+@lru_cache(maxsize=_EPC_CACHE_SIZE)
+def _classify_epc(epc: str) -> Optional[Tuple[str, str, str]]:
+    """Split an EPC URN into its type and first two numeric fields
+
+    Hand-written equivalent of EPC_PATTERNS: walks the string once with
+    partition/isdigit instead of running a regex per scheme. Memoized since
+    the same EPCs recur across parent/child lists and events.
+
+    Args:
+        epc: EPC string to classify
+
+    Returns:
+        (epc_type, company_prefix, reference) if the EPC matches one of
+        the GS1 layouts, None otherwise
+    """
+    if not epc.startswith(_EPC_URN_PREFIX):
+        return None
+    scheme, sep, tail = epc[len(_EPC_URN_PREFIX):].partition(':')
+    scheme_info = _EPC_SCHEMES.get(scheme)
+    if not sep or scheme_info is None:
+        return None
+    # Report the shared type string rather than the slice taken from this EPC
+    epc_type, has_serial = scheme_info
+    # The patterns end in '$', which also matches before a single trailing newline
+    if tail.endswith('\n'):
+        tail = tail[:-1]
+    company_prefix, sep, reference = tail.partition('.')
+    if not sep or not _is_digits(company_prefix):
+        return None
+    if has_serial:
+        # <CompanyPrefix>.<ItemReference>.<SerialNumber>, serial of 1-20 alphanumerics
+        reference, sep, serial = reference.partition('.')
+        if not sep or not 1 <= len(serial) <= 20 or not _is_alphanumeric(serial):
+            return None
+    if not _is_digits(reference):
+        return None
+    return epc_type, company_prefix, reference
 
 
 class GS1IdentifierValidator:
@@ -7,17 +77,15 @@ class GS1IdentifierValidator:
     
     # GS1 identifier patterns
     EPC_PATTERNS = {
-        # Updated SGTIN pattern to properly validate SGTIN-198 format:
-        # <CompanyPrefix>.<ItemReference>.<SerialNumber>
-        # Where SerialNumber must be 1-20 alphanumeric characters
-        'sgtin': r'^urn:epc:id:sgtin:(\d+)\.(\d+)\.([A-Za-z0-9]{1,20})$',
-        'sscc': r'^urn:epc:id:sscc:(\d+)\.(\d+)$',
-        'sgln': r'^urn:epc:id:sgln:(\d+)\.(\d+)$',
-        'grai': r'^urn:epc:id:grai:(\d+)\.(\d+)$',
-        'giai': r'^urn:epc:id:giai:(\d+)\.(\d+)$',
+        'sgtin': _SGTIN_RE,
+        'sscc': _SSCC_RE,
+        'sgln': _SGLN_RE,
+        'grai': _GRAI_RE,
+        'giai': _GIAI_RE,
     }
 
     @staticmethod
+    @lru_cache(maxsize=8192)
     def calculate_gs1_check_digit(number_str: str) -> str:
         """Calculate GS1 check digit for a number string
         
@@ -27,11 +95,8 @@ class GS1IdentifierValidator:
         Returns:
             Check digit as string
         """
-        # Reverse the string to start from right
-        total = 0
-        for i, digit in enumerate(reversed(number_str)):
-            multiplier = 3 if i % 2 == 0 else 1
-            total += int(digit) * multiplier
+        # From the right, digits alternate between weight 3 and weight 1
+        total = 3 * sum(map(int, number_str[::-2])) + sum(map(int, number_str[-2::-2]))
         
         check_digit = (10 - (total % 10)) % 10
         return str(check_digit)
@@ -54,6 +119,29 @@ class GS1IdentifierValidator:
         
         return GS1IdentifierValidator.calculate_gs1_check_digit(number) == check_digit
 
+    @classmethod
+    def classify_epc(cls, epc: str) -> Optional[str]:
+        """Validate an EPC and return its type in one pass
+
+        Args:
+            epc: EPC string to classify
+
+        Returns:
+            str: EPC type if the EPC is valid, None otherwise
+        """
+        parsed = _classify_epc(epc)
+        if parsed is None:
+            return None
+        epc_type, company_prefix, reference = parsed
+        # Enforce SSCC total digits = 17
+        if epc_type == 'sscc' and len(company_prefix) + len(reference) != 17:
+            return None
+        # GLN check digit validation for SGLN
+        if epc_type == 'sgln' and not cls.validate_gs1_check_digit(company_prefix + reference):
+            return None
+        # SGTIN, GRAI and GIAI only need the layout to match
+        return epc_type
+
     @classmethod
     def validate_epc_format(cls, epc: str) -> bool:
         """Validate if an EPC matches any of the valid patterns
@@ -64,24 +152,7 @@ class GS1IdentifierValidator:
         Returns:
             bool: True if EPC matches a valid pattern
         """
-        for epc_type, pattern in cls.EPC_PATTERNS.items():
-            m = re.match(pattern, epc)
-            if not m:
-                continue
-            # Enforce SSCC total digits = 17
-            if epc_type == 'sscc':
-                combined = m.group(1) + m.group(2)
-                return combined.isdigit() and len(combined) == 17
-            # GLN check digit validation for SGLN
-            if epc_type == 'sgln':
-                number = m.group(1) + m.group(2)
-                return number.isdigit() and GS1IdentifierValidator.validate_gs1_check_digit(number)
-            # For GRAI and GIAI, ensure numeric segments
-            if epc_type in ('grai', 'giai'):
-                return m.group(1).isdigit() and m.group(2).isdigit()
-            # SGTIN default
-            return True
-        return False
+        return cls.classify_epc(epc) is not None
 
     @classmethod
     def get_epc_type(cls, epc: str) -> Optional[str]:
@@ -91,17 +162,17 @@ class GS1IdentifierValidator:
             epc: EPC string to check
             
         Returns:
-            str: EPC type if valid, None if invalid
+            str: EPC type if the layout matches, None otherwise. Unlike
+            classify_epc, SSCC length and SGLN check digits are not checked
         """
         if not epc:
             return None
             
-        for epc_type, pattern in cls.EPC_PATTERNS.items():
-            if re.match(pattern, epc):
-                return epc_type
-        return None
+        parsed = _classify_epc(epc)
+        return parsed[0] if parsed else None
 
     @staticmethod
+    @lru_cache(maxsize=_EPC_CACHE_SIZE)
     def extract_company_prefix(epc: str) -> Optional[str]:
         """Extract company prefix from an EPC
         
@@ -114,12 +185,17 @@ class GS1IdentifierValidator:
         if not epc:
             return None
             
-        parts = epc.split(':')
-        if len(parts) >= 5:
-            company_parts = parts[4].split('.')
-            if company_parts:
-                return company_parts[0]
-        return None
+        # The prefix is the fifth ':'-separated field up to its first '.'
+        # (urn:epc:id:sgtin:COMPANY.ITEM.SERIAL); locate it without building a list
+        start = -1
+        for _ in range(4):
+            start = epc.find(':', start + 1)
+            if start < 0:
+                return None
+        end = epc.find(':', start + 1)
+        field = epc[start + 1:end] if end >= 0 else epc[start + 1:]
+        # Interned: the same few prefixes end up in every companies set and lookup
+        return sys.intern(field.partition('.')[0])
 
     @staticmethod
     def validate_company_prefix(epc: str, authorized_companies: set) -> bool:
@@ -132,5 +208,20 @@ class GS1IdentifierValidator:
         Returns:
             bool: True if company prefix is authorized
         """
+        if not authorized_companies:
+            return False
         company_prefix = GS1IdentifierValidator.extract_company_prefix(epc)
+        return GS1IdentifierValidator.is_authorized_prefix(company_prefix, authorized_companies)
+
+    @staticmethod
+    def is_authorized_prefix(company_prefix: Optional[str], authorized_companies: set) -> bool:
+        """Check an already extracted company prefix against the authorized set
+        
+        Args:
+            company_prefix: Prefix from extract_company_prefix
+            authorized_companies: Set of authorized company prefixes
+            
+        Returns:
+            bool: True if company prefix is authorized
+        """
         return company_prefix in authorized_companies if company_prefix else False
\ No newline at end of file
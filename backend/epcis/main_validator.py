@@ -43,7 +43,7 @@ class EPCISValidator:
                 errors.extend(hierarchy_errors)
             
             # Determine overall validity
-            is_valid = len([e for e in errors if e['severity'] == 'error']) == 0
+            is_valid = not any(e['severity'] == 'error' for e in errors)
             
             return {
                 'valid': is_valid,
@@ -74,32 +74,41 @@ class EPCISValidator:
             Dict containing error summary
         """
         errors = validation_result.get('errors', [])
-        summary = {
-            'total': len(errors),
-            'errors': len([e for e in errors if e['severity'] == 'error']),
-            'warnings': len([e for e in errors if e['severity'] == 'warning']),
-            'by_type': {},
-            'critical_issues': []
-        }
+        error_count = 0
+        warning_count = 0
+        by_type = {}
+        critical_issues = []
         
-        # Group errors by type
+        # Count severities and group by type in a single pass
         for error in errors:
             error_type = error['type']
-            if error_type not in summary['by_type']:
-                summary['by_type'][error_type] = {
+            severity = error['severity']
+            type_counts = by_type.get(error_type)
+            if type_counts is None:
+                type_counts = by_type[error_type] = {
                     'total': 0,
                     'errors': 0,
                     'warnings': 0
                 }
             
-            summary['by_type'][error_type]['total'] += 1
-            if error['severity'] == 'error':
-                summary['by_type'][error_type]['errors'] += 1
+            type_counts['total'] += 1
+            if severity == 'error':
+                error_count += 1
+                type_counts['errors'] += 1
+                # Track critical sequence and hierarchy errors
+                if error_type in ('sequence', 'hierarchy'):
+                    critical_issues.append(error['message'])
             else:
-                summary['by_type'][error_type]['warnings'] += 1
-            
-            # Track critical sequence and hierarchy errors
-            if error['severity'] == 'error' and error_type in ['sequence', 'hierarchy']:
-                summary['critical_issues'].append(error['message'])
+                if severity == 'warning':
+                    warning_count += 1
+                type_counts['warnings'] += 1
+        
+        summary = {
+            'total': len(errors),
+            'errors': error_count,
+            'warnings': warning_count,
+            'by_type': by_type,
+            'critical_issues': critical_issues
+        }
         
         return summary
@@ -1,8 +1,57 @@
 import json
+import sys
+from io import BytesIO
+from itertools import chain
 import lxml.etree as ET
 from typing import Dict, List, Set, Tuple, Optional
-from .utils import extract_namespaces, logger
+from .utils import loads_json, log_validation_warning, logger
 from .utils import validate_dates_order
+from .identifier_validation import GS1IdentifierValidator
+from .epc_kernels import company_prefix_spans, PREFIX_NONE, PREFIX_UNDECIDED
+
+# Event elements collected from XML documents, in output order
+_XML_EVENT_TAGS = ('ObjectEvent', 'AggregationEvent')
+_SBDH_TAG = 'StandardBusinessDocumentHeader'
+
+# Clark-notation tag -> interned local name; documents only use a handful of tags,
+# and interning makes them the same objects as the key literals compared against
+_LOCAL_NAMES: Dict[str, str] = {}
+_LOCAL_NAME_CACHE_SIZE = 4096
+
+# Tags _xml_to_dict converts with dedicated handling; every other tag takes the
+# generic path, so one set lookup routes the common case
+_SPECIAL_TAGS = frozenset({'epcList', 'childEPCs', 'bizTransactionList', 'readPoint', 'bizLocation', 'extension'})
+
+# EPC lists at least this long get their company prefixes from the compiled kernel
+_BULK_PREFIX_THRESHOLD = 64
+
+
+def _company_prefixes(epcs: List[str]) -> Optional[List[Optional[str]]]:
+    """Extract the company prefix of every EPC in a long list at once
+
+    Args:
+        epcs: EPC values
+
+    Returns:
+        extract_company_prefix's result per EPC, or None when the list is
+        short or the compiled kernel cannot take it
+    """
+    if len(epcs) < _BULK_PREFIX_THRESHOLD:
+        return None
+    spans = company_prefix_spans(epcs)
+    if spans is None:
+        return None
+    extract = GS1IdentifierValidator.extract_company_prefix
+    prefixes = []
+    for epc, (start, end) in zip(epcs, spans):
+        if start == PREFIX_NONE:
+            prefixes.append(None)
+        elif start == PREFIX_UNDECIDED:
+            prefixes.append(extract(epc))
+        else:
+            # Interned like extract_company_prefix's results
+            prefixes.append(sys.intern(epc[start:end]))
+    return prefixes
 
 
 class EPCISParser:
@@ -67,101 +116,74 @@ class EPCISParser:
         companies = set()
         header = None
         try:
-            # Use lxml parser which maintains line numbers
-            parser = ET.XMLParser(remove_blank_text=True)
-            root = ET.fromstring(content, parser)
-            
+            # Stream the document so each top-level event subtree can be released
+            # as soon as it has been converted
+            context = ET.iterparse(BytesIO(content), events=('start', 'end', 'start-ns'),
+                                   tag=_XML_EVENT_TAGS + (_SBDH_TAG,), remove_blank_text=True)
+            # Namespace declarations as reported by the parser itself; only whether
+            # there were any, and whether one was EPCIS, is needed
+            has_namespaces = False
+            has_epcis_namespace = False
+            header_elem = None
+            header_open = False
+            doc_header = None
+            doc_companies = set()
+            # (event, errors) slots in document order, bucketed by tag so the
+            # results keep findall() ordering: all ObjectEvents, then AggregationEvents
+            parsed_by_tag = {tag: [] for tag in _XML_EVENT_TAGS}
+            open_slots = []
+            for action, elem in context:
+                if action == 'start-ns':
+                    has_namespaces = True
+                    if not has_epcis_namespace and 'epcis' in elem[1].lower():
+                        has_epcis_namespace = True
+                    continue
+                tag = elem.tag
+                if elem.getparent() is None:
+                    continue  # the root element itself is never a header or event
+                if tag == _SBDH_TAG:
+                    # First header in document order, converted once complete
+                    if action == 'start':
+                        if header_elem is None:
+                            header_elem = elem
+                            header_open = True
+                    elif elem is header_elem:
+                        doc_header = EPCISParser._xml_to_dict(elem)
+                        header_open = False
+                        if not open_slots:
+                            # Nothing still open needs the header subtree
+                            elem.clear(keep_tail=True)
+                    continue
+                if action == 'start':
+                    open_slots.append(len(parsed_by_tag[tag]))
+                    parsed_by_tag[tag].append(None)
+                    continue
+                parsed_by_tag[tag][open_slots.pop()] = EPCISParser._parse_xml_event(elem, doc_companies)
+                if not open_slots and not header_open:
+                    # Top-level event done: free its subtree and everything before it
+                    # at this level, which has already been consumed
+                    elem.clear(keep_tail=True)
+                    parent = elem.getparent()
+                    while elem.getprevious() is not None:
+                        del parent[0]
+            del context
+
             # Validate EPCIS namespace
-            namespaces = extract_namespaces(content.decode('utf-8'))
-            if not any('epcis' in ns.lower() for ns in namespaces):
+            if not has_namespaces:
+                log_validation_warning('namespace', "No namespaces found in XML document")
+            if not has_epcis_namespace:
                 errors.append({
                     'type': 'structure',
                     'severity': 'error',
                     'message': "Missing EPCIS namespace declaration"
                 })
-                
-            # Extract header
-            header_elem = root.find('.//StandardBusinessDocumentHeader')
-            if header_elem is not None:
-                header = EPCISParser._xml_to_dict(header_elem)
-                
-            # Extract events with line number information
-            for event_elem in root.findall('.//ObjectEvent') + root.findall('.//AggregationEvent'):
-                try:
-                    # Basic event structure with event-level line number
-                    event = EPCISParser._xml_to_dict(event_elem)
-                    # assign eventType for validator
-                    event['eventType'] = event_elem.tag
-                    event['_line_number'] = event_elem.sourceline
-                    EPCISParser._normalize_event_fields(event)
-                    
-                    # Add recordTime from XML for date-order validation
-                    rec_elem = event_elem.find('.//recordTime')
-                    if rec_elem is not None and rec_elem.text:
-                        event['recordTime'] = rec_elem.text.strip()
-                    
-                    # date-order validation - only if both dates are present
-                    if 'eventTime' in event and 'recordTime' in event:
-                        date_errors = []
-                        if not validate_dates_order(event['eventTime'], event['recordTime']):
-                            date_errors.append({
-                                'type': 'sequence',
-                                'severity': 'error',
-                                'message': f"Invalid date order: eventTime {event['eventTime']} is not before recordTime {event['recordTime']}"
-                            })
-                        if date_errors:
-                            errors.extend(date_errors)
-                    
-                    # Process EPCs with detailed line number tracking
-                    epc_list_elem = event_elem.find('.//epcList')
-                    if epc_list_elem is not None:
-                        epc_elements = []
-                        for epc_elem in epc_list_elem.findall('.//epc'):
-                            if epc_elem.text:
-                                epc_value = epc_elem.text.strip()
-                                # Store each EPC with its own line number
-                                epc_elements.append({
-                                    'value': epc_value,
-                                    'line_number': epc_elem.sourceline
-                                })
-                                
-                                # Extract company prefixes
-                                company = epc_value.split(':')[4].split('.')[0] if len(epc_value.split(':')) > 4 else None
-                                if company:
-                                    companies.add(company)
-                        
-                        # Replace string list with detailed info
-                        event['epcList_detailed'] = epc_elements
-                    
-                    # Similarly process childEPCs
-                    child_epcs_elem = event_elem.find('.//childEPCs')
-                    if child_epcs_elem is not None:
-                        child_epc_elements = []
-                        for epc_elem in child_epcs_elem.findall('.//epc'):
-                            if epc_elem.text:
-                                epc_value = epc_elem.text.strip()
-                                # Store each EPC with its own line number
-                                child_epc_elements.append({
-                                    'value': epc_value,
-                                    'line_number': epc_elem.sourceline
-                                })
-                                
-                                # Extract company prefixes
-                                company = epc_value.split(':')[4].split('.')[0] if len(epc_value.split(':')) > 4 else None
-                                if company:
-                                    companies.add(company)
-                        
-                        # Replace string list with detailed info
-                        event['childEPCs_detailed'] = child_epc_elements
-                    
-                    events.append(event)
-                            
-                except Exception as e:
-                    errors.append({
-                        'type': 'format',
-                        'severity': 'error',
-                        'message': f"Error parsing event: {str(e)}"
-                    })
+
+            header = doc_header
+            for tag in _XML_EVENT_TAGS:
+                slots = parsed_by_tag[tag]
+                errors.extend(chain.from_iterable(event_errors for _, event_errors in slots))
+                events.extend(event for event, _ in slots if event is not None)
+            companies = doc_companies
         except ET.ParseError as e:
             errors.append({
                 'type': 'format',
@@ -176,6 +198,97 @@ class EPCISParser:
             })
         return header, events, companies, errors
 
+    @staticmethod
+    def _parse_xml_event(event_elem: ET.Element, companies: Set[str]) -> Tuple[Optional[Dict], List[Dict]]:
+        """Convert one XML event element, collecting its company prefixes
+
+        Args:
+            event_elem: ObjectEvent or AggregationEvent element
+            companies: Set that company prefixes found in the event are added to
+
+        Returns:
+            Tuple of (event dict or None if conversion failed, errors)
+        """
+        errors = []
+        try:
+            # Basic event structure with event-level line number
+            epc_lines = {}
+            event = EPCISParser._xml_to_dict(event_elem, epc_lines)
+            # assign eventType for validator
+            event['eventType'] = event_elem.tag
+            event['_line_number'] = event_elem.sourceline
+            EPCISParser._normalize_event_fields(event)
+            
+            # Add recordTime from XML for date-order validation
+            rec_elem = next(event_elem.iter('recordTime'), None)
+            if rec_elem is not None and rec_elem.text:
+                event['recordTime'] = rec_elem.text.strip()
+            
+            # date-order validation - only if both dates are present
+            if 'eventTime' in event and 'recordTime' in event:
+                if not validate_dates_order(event['eventTime'], event['recordTime']):
+                    errors.append({
+                        'type': 'sequence',
+                        'severity': 'error',
+                        'message': f"Invalid date order: eventTime {event['eventTime']} is not before recordTime {event['recordTime']}"
+                    })
+            
+            # Process EPCs with detailed line number tracking, reusing the
+            # values _xml_to_dict already read where it reached the same list
+            epc_list_elem = next(event_elem.iter('epcList'), None)
+            if epc_list_elem is not None:
+                # Replace string list with detailed info
+                event['epcList_detailed'] = EPCISParser._detailed_epcs(epc_list_elem, epc_lines, companies)
+            
+            # Similarly process childEPCs
+            child_epcs_elem = next(event_elem.iter('childEPCs'), None)
+            if child_epcs_elem is not None:
+                event['childEPCs_detailed'] = EPCISParser._detailed_epcs(child_epcs_elem, epc_lines, companies)
+            
+            return event, errors
+                    
+        except Exception as e:
+            errors.append({
+                'type': 'format',
+                'severity': 'error',
+                'message': f"Error parsing event: {str(e)}"
+            })
+            return None, errors
+
+    @staticmethod
+    def _detailed_epcs(list_elem: ET.Element, epc_lines: Dict, companies: Set[str]) -> List[Dict]:
+        """Build the detailed EPC entries for an epcList/childEPCs element
+
+        Args:
+            list_elem: epcList or childEPCs element
+            epc_lines: (value, line number) pairs per list element, as collected by _xml_to_dict
+            companies: Set that company prefixes are added to
+
+        Returns:
+            List of dicts with each EPC's value, line number and company prefix
+        """
+        lines = epc_lines.get(list_elem)
+        if lines is None:
+            # Not reached by _xml_to_dict (e.g. nested in an extension), so read it here
+            lines = [(epc.text.strip(), epc.sourceline) for epc in list_elem.iter('epc') if epc.text]
+        prefixes = _company_prefixes([epc_value for epc_value, _ in lines])
+        if prefixes is None:
+            prefixes = [GS1IdentifierValidator.extract_company_prefix(epc_value) for epc_value, _ in lines]
+        epc_elements = []
+        for (epc_value, line_number), company in zip(lines, prefixes):
+            # Store each EPC with its own line number and company prefix,
+            # so the event validator does not extract it again
+            epc_elements.append({
+                'value': epc_value,
+                'line_number': line_number,
+                'company': company
+            })
+            
+            # Extract company prefixes
+            if company:
+                companies.add(company)
+        return epc_elements
+
     @staticmethod
     def _parse_json(content: bytes) -> Tuple[Optional[Dict], List[Dict], Set[str], List[Dict]]:
         """Parse JSON EPCIS document
@@ -192,7 +305,7 @@ class EPCISParser:
         header = None
 
         try:
-            data = json.loads(content)
+            data = loads_json(content)
             
             # Validate EPCIS context
             if '@context' not in data or not any('epcis' in str(ctx).lower() for ctx in data.get('@context', [])):
@@ -227,10 +340,15 @@ class EPCISParser:
                     events.append(event)
                     
                     # Extract company prefixes
-                    for epc in event.get('epcList', []) + event.get('childEPCs', []):
-                        company = epc.split(':')[4].split('.')[0] if len(epc.split(':')) > 4 else None
-                        if company:
-                            companies.add(company)
+                    event_epcs = event.get('epcList', []) + event.get('childEPCs', [])
+                    prefixes = _company_prefixes(event_epcs)
+                    if prefixes is not None:
+                        companies.update(filter(None, prefixes))
+                    else:
+                        for epc in event_epcs:
+                            company = GS1IdentifierValidator.extract_company_prefix(epc)
+                            if company:
+                                companies.add(company)
                             
                 except Exception as e:
                     errors.append({
@@ -269,88 +387,131 @@ class EPCISParser:
                 event[new] = event.pop(old)
 
     @staticmethod
-    def _xml_to_dict(element: ET.Element) -> Dict:
+    def _xml_to_dict(element: ET.Element, epc_lines: Optional[Dict] = None) -> Dict:
         """Convert XML element to dictionary
         
+        Walks the subtree with an explicit stack rather than recursing, one
+        frame per element that has children or attributes.
+        
         Args:
             element: XML element to convert
+            epc_lines: Optional dict that receives the (value, line number)
+                pairs of each epcList/childEPCs element converted
             
         Returns:
             Dict representation of XML element
         """
-        result = {}
-        
-        # Handle attributes
-        for key, value in element.attrib.items():
-            result[key] = value
-            
-        # Handle child elements
-        for child in element:
-            tag = child.tag.split('}')[-1]  # Remove namespace
+        # Frames of (element, result dict, child iterator, tag in parent);
+        # attributes are handled when the frame is created
+        stack = [(element, dict(element.attrib), iter(element), None)]
+        local_names = _LOCAL_NAMES
+        while True:
+            current, result, children, current_tag = stack[-1]
+            descended = False
             
-            # Special handling for known array fields
-            if tag in ['epcList', 'childEPCs']:
-                # These should contain a list of epc elements
-                if tag not in result:
-                    result[tag] = []
-                for epc in child.findall('.//epc'):
-                    if epc.text:
-                        result[tag].append(epc.text.strip())
-            elif tag == 'bizTransactionList':
-                # Handle business transactions
-                if tag not in result:
-                    result[tag] = []
-                for txn in child.findall('.//bizTransaction'):
-                    if txn.text:
-                        result[tag].append({
-                            'type': txn.get('type'),
-                            'bizTransaction': txn.text.strip()
-                        })
-            elif tag in ['readPoint', 'bizLocation']:
-                # Handle location identifiers
-                id_elem = child.find('.//id')
-                if id_elem is not None and id_elem.text:
-                    result[tag] = {'id': id_elem.text.strip()}
-            elif tag == 'extension':
-                # Handle extension elements
-                if tag not in result:
-                    result[tag] = {}
-                
-                # Process source and destination lists
-                source_list = child.find('.//sourceList')
-                if source_list is not None:
-                    result[tag]['sourceList'] = [
-                        {'type': src.get('type'), 'source': src.text.strip()}
-                        for src in source_list.findall('.//source')
-                        if src.text
-                    ]
+            # Handle child elements
+            for child in children:
+                qualified_tag = child.tag
+                tag = local_names.get(qualified_tag)
+                if tag is None:
+                    tag = sys.intern(qualified_tag.split('}')[-1])  # Remove namespace
+                    if len(local_names) >= _LOCAL_NAME_CACHE_SIZE:
+                        local_names.clear()
+                    local_names[qualified_tag] = tag
                 
-                dest_list = child.find('.//destinationList')
-                if dest_list is not None:
-                    result[tag]['destinationList'] = [
-                        {'type': dest.get('type'), 'destination': dest.text.strip()}
-                        for dest in dest_list.findall('.//destination')
-                        if dest.text
-                    ]
-            else:
-                # Handle other elements normally
-                child_data = EPCISParser._xml_to_dict(child)
-                if tag in result:
-                    if isinstance(result[tag], list):
-                        result[tag].append(child_data)
-                    else:
-                        result[tag] = [result[tag], child_data]
+                if tag not in _SPECIAL_TAGS:
+                    if len(child) or child.attrib:
+                        # Handle other elements normally: descend, and resume this
+                        # element's remaining children once the child is complete
+                        stack.append((child, dict(child.attrib), iter(child), tag))
+                        descended = True
+                        break
+                    # Leaves (most of an event) are converted in place
+                    child_data = child.text.strip() if child.text else ''
+                    EPCISParser._add_child_value(result, tag, child_data or {})
+                # Special handling for known array fields
+                elif tag in ('epcList', 'childEPCs'):
+                    # These should contain a list of epc elements
+                    if tag not in result:
+                        result[tag] = []
+                    lines = []
+                    for epc in child.iter('epc'):
+                        if epc.text:
+                            epc_value = epc.text.strip()
+                            result[tag].append(epc_value)
+                            lines.append((epc_value, epc.sourceline))
+                    if epc_lines is not None:
+                        epc_lines[child] = lines
+                elif tag == 'bizTransactionList':
+                    # Handle business transactions
+                    if tag not in result:
+                        result[tag] = []
+                    for txn in child.iter('bizTransaction'):
+                        if txn.text:
+                            result[tag].append({
+                                'type': txn.get('type'),
+                                'bizTransaction': txn.text.strip()
+                            })
+                elif tag in ('readPoint', 'bizLocation'):
+                    # Handle location identifiers
+                    id_elem = next(child.iter('id'), None)
+                    if id_elem is not None and id_elem.text:
+                        result[tag] = {'id': id_elem.text.strip()}
+                elif tag == 'extension':
+                    # Handle extension elements
+                    if tag not in result:
+                        result[tag] = {}
+                    
+                    # Process source and destination lists: the first of each,
+                    # found in one walk of the extension
+                    source_list = dest_list = None
+                    for list_elem in child.iter('sourceList', 'destinationList'):
+                        if list_elem.tag == 'sourceList':
+                            if source_list is None:
+                                source_list = list_elem
+                        elif dest_list is None:
+                            dest_list = list_elem
+                        if source_list is not None and dest_list is not None:
+                            break
+                    
+                    if source_list is not None:
+                        result[tag]['sourceList'] = [
+                            {'type': src.get('type'), 'source': src.text.strip()}
+                            for src in source_list.iter('source')
+                            if src.text
+                        ]
+                    
+                    if dest_list is not None:
+                        result[tag]['destinationList'] = [
+                            {'type': dest.get('type'), 'destination': dest.text.strip()}
+                            for dest in dest_list.iter('destination')
+                            if dest.text
+                        ]
+            if descended:
+                continue
+            
+            # Handle text content
+            stack.pop()
+            value = result
+            text = current.text.strip() if current.text else ''
+            if text:
+                if len(result) == 0:
+                    # If no children/attributes, just return the text
+                    value = text
                 else:
-                    result[tag] = child_data
-                
-        # Handle text content
-        if element.text and element.text.strip():
-            text = element.text.strip()
-            if len(result) == 0:
-                # If no children/attributes, just return the text
-                return text
+                    # Add as value field if we have other data
+                    result['value'] = text
+            if not stack:
+                return value
+            EPCISParser._add_child_value(stack[-1][1], current_tag, value)
+
+    @staticmethod
+    def _add_child_value(result: Dict, tag: str, child_data):
+        """Store a converted child, collecting repeated tags into a list"""
+        if tag in result:
+            if isinstance(result[tag], list):
+                result[tag].append(child_data)
             else:
-                # Add as value field if we have other data
-                result['value'] = text
-                
-        return result
\ No newline at end of file
+                result[tag] = [result[tag], child_data]
+        else:
+            result[tag] = child_data
@@ -1,8 +1,43 @@
+import sys
 from datetime import datetime
 from collections import defaultdict
+from itertools import chain
+from operator import itemgetter
 from typing import Dict, List, Set, Any
 from .utils import add_error, validate_dates_order
 
+# EPC URN prefixes tracked for commissioning, with their commissioned_items key
+_COMMISSIONED_SCHEMES = (('urn:epc:id:sgtin:', 'SGTIN'), ('urn:epc:id:sscc:', 'SSCC'))
+
+
+def _commissioned_scheme(epc: str):
+    """Return the commissioned_items key for an EPC, or None if it is not tracked"""
+    for prefix, scheme in _COMMISSIONED_SCHEMES:
+        if epc.startswith(prefix):
+            return scheme
+    return None
+
+
+# datetime.fromisoformat reads a trailing 'Z' natively from Python 3.11 on
+_FROMISOFORMAT_READS_Z = sys.version_info >= (3, 11)
+
+
+def _parse_event_time(value: str) -> datetime:
+    """Parse an eventTime, treating 'Z' as UTC
+
+    Equivalent to datetime.fromisoformat(value.replace('Z', '+00:00')) but
+    skips the copy when 'Z' can only be the UTC designator. That form is
+    still used otherwise, so rejected values raise the same error message.
+    """
+    # 3.11 also takes 'Z' as the date/time separator, which the replace form rejects
+    if _FROMISOFORMAT_READS_Z and value.find('Z', 0, len(value) - 1) < 0:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+
 class EPCISSequenceValidator:
     """Validator for EPCIS event sequences according to DSCSA rules"""
     
@@ -67,14 +102,36 @@ class EPCISSequenceValidator:
         }
     }
 
+    # Fully qualified CBV bizStep URIs -> short step names, so the common case is one lookup
+    _BIZ_STEP_NAMES = {f'urn:epcglobal:cbv:bizstep:{step}': step for step in SEQUENCE_RULES}
+
+    # Allowed dispositions per step as sets, for the per-EPC membership test
+    _ALLOWED_DISPOSITIONS = {
+        step: frozenset(rules['allowed_dispositions']) for step, rules in SEQUENCE_RULES.items()
+    }
+
+    # Predecessor steps as sets, tested against the steps each EPC has already seen
+    _PREDECESSORS = {
+        step: frozenset(rules['predecessors']) for step, rules in SEQUENCE_RULES.items()
+    }
+
+    # Position of each step in EVENT_SEQUENCE
+    _STEP_ORDER: Dict[str, int] = {step: i for i, step in enumerate(EVENT_SEQUENCE)}
+
+    # Steps a complete chain of custody may end with
+    _TERMINAL_STEPS = frozenset({'dispensing', 'decommissioning', 'returns'})
+
     def __init__(self):
         # Track commissioned and aggregated items
         self.commissioned_items: Dict[str, Set[str]] = {
             'SGTIN': set(),  # Track commissioned SGTINs
             'SSCC': set(),   # Track commissioned SSCCs
         }
+        self._commissioned_all: Set[str] = set()  # union of the commissioned_items sets
         self.aggregated_items: Dict[str, str] = {}  # child_epc -> parent_epc
         self.event_times: Dict[str, Dict[str, datetime]] = defaultdict(dict)  # epc -> {step -> time}
+        self._steps_seen: Dict[str, Set[str]] = defaultdict(set)  # epc -> steps in event_sequence[epc]
+        self._unsorted_epcs: Set[str] = set()  # EPCs whose event_sequence entries arrived out of time order
 
     def validate_sequence(self, events: List[Dict[str, Any]]) -> List[Dict[str, str]]:
         """Validate a sequence of EPCIS events
@@ -87,14 +144,17 @@ class EPCISSequenceValidator:
         """
         errors = []
         event_sequence = defaultdict(list)  # EPC -> list of (bizStep, time) tuples
+        # Mirrors event_sequence, so it starts empty on every call too
+        self._steps_seen = defaultdict(set)
+        self._unsorted_epcs = set()
         
-        # First pass: collect all commissioned items
+        # Single pass in the order the events were handed over (for XML the
+        # parser yields all ObjectEvents, then all AggregationEvents): items only
+        # count as commissioned from their commissioning event on, so use in an
+        # earlier event is reported
         for event in events:
             if event.get('bizStep', '').endswith('commissioning'):
                 self._process_commissioning(event)
-        
-        # Second pass: validate event sequence
-        for event in events:
             self._validate_event_sequence(event, event_sequence, errors)
             
         # Final validation of complete sequence
@@ -106,17 +166,19 @@ class EPCISSequenceValidator:
         """Process commissioning event to track commissioned items"""
         epcs = event.get('epcList', [])
         for epc in epcs:
-            if epc.startswith('urn:epc:id:sgtin:'):
-                self.commissioned_items['SGTIN'].add(epc)
-            elif epc.startswith('urn:epc:id:sscc:'):
-                self.commissioned_items['SSCC'].add(epc)
+            scheme = _commissioned_scheme(epc)
+            if scheme is not None:
+                self.commissioned_items[scheme].add(epc)
+                self._commissioned_all.add(epc)
 
     def _validate_event_sequence(self, event: Dict[str, Any], event_sequence: Dict[str, List], errors: List[Dict[str, str]]):
         """Validate single event in sequence context"""
         try:
-            event_dt = datetime.fromisoformat(event['eventTime'].replace('Z', '+00:00'))
-            biz_step = event.get('bizStep', '').split(':')[-1]
-            epcs = event.get('epcList', []) + event.get('childEPCs', [])
+            event_dt = _parse_event_time(event['eventTime'])
+            biz_step = event.get('bizStep', '')
+            # Interned, as it keys event_times for every EPC in the event
+            biz_step = self._BIZ_STEP_NAMES.get(biz_step) or sys.intern(biz_step.rpartition(':')[2])
+            epcs = chain(event.get('epcList') or (), event.get('childEPCs') or ())
 
             # date-order validation using recordTime
             if 'recordTime' in event:
@@ -124,6 +186,11 @@ class EPCISSequenceValidator:
                 if date_errors:
                     errors.extend(date_errors)
 
+            # Rules and the disposition verdict are the same for every EPC in the event
+            rules = self.SEQUENCE_RULES.get(biz_step)
+            valid_predecessors = rules['predecessors'] if rules is not None else None
+            disposition_error = None
+
             # Validate each EPC's sequence
             for epc in epcs:
                 # enforce chronological order per EPC
@@ -134,37 +201,39 @@ class EPCISSequenceValidator:
                         add_error(errors, 'sequence', 'error',
                                   f"Event time {event_dt.isoformat()} for {biz_step} is before previous event time {max_prev.isoformat()} for {epc}")
                 
-                # Check if item was commissioned
-                if epc.startswith('urn:epc:id:sgtin:'):
-                    if epc not in self.commissioned_items['SGTIN']:
-                        add_error(errors, 'sequence', 'error',
-                                f"SGTIN {epc} not commissioned before {biz_step}")
-                elif epc.startswith('urn:epc:id:sscc:'):
-                    if epc not in self.commissioned_items['SSCC']:
+                # Check if item was commissioned; the scheme is only needed
+                # for EPCs that were not
+                if epc not in self._commissioned_all:
+                    scheme = _commissioned_scheme(epc)
+                    if scheme is not None:
                         add_error(errors, 'sequence', 'error',
-                                f"SSCC {epc} not commissioned before {biz_step}")
+                                f"{scheme} {epc} not commissioned before {biz_step}")
                 
                 # Check sequence rules
-                if biz_step in self.SEQUENCE_RULES:
+                if rules is not None:
                     # Check predecessors
-                    valid_predecessors = self.SEQUENCE_RULES[biz_step]['predecessors']
                     if valid_predecessors:
-                        predecessors = [step for step, _ in event_sequence[epc]]
-                        if not any(pred in predecessors for pred in valid_predecessors):
+                        if self._steps_seen[epc].isdisjoint(self._PREDECESSORS[biz_step]):
                             add_error(errors, 'sequence', 'error',
                                     f"EPC {epc} has {biz_step} event without required predecessor(s): {valid_predecessors}")
                     
                     # Store event in sequence
-                    event_sequence[epc].append((biz_step, event_dt))
+                    steps = event_sequence[epc]
+                    if steps and event_dt < steps[-1][1]:
+                        self._unsorted_epcs.add(epc)
+                    steps.append((biz_step, event_dt))
+                    self._steps_seen[epc].add(biz_step)
                     self.event_times[epc][biz_step] = event_dt
                     
                     # Validate disposition
                     if 'disposition' in event:
-                        disp = event['disposition'].split(':')[-1]
-                        allowed_disp = self.SEQUENCE_RULES[biz_step]['allowed_dispositions']
-                        if disp not in allowed_disp:
-                            add_error(errors, 'sequence', 'error',
-                                    f"Invalid disposition {disp} for {biz_step} event")
+                        if disposition_error is None:
+                            disp = event['disposition'].split(':')[-1]
+                            disposition_error = ''
+                            if disp not in self._ALLOWED_DISPOSITIONS[biz_step]:
+                                disposition_error = f"Invalid disposition {disp} for {biz_step} event"
+                        if disposition_error:
+                            add_error(errors, 'sequence', 'error', disposition_error)
         
         except ValueError as e:
             add_error(errors, 'sequence', 'error',
@@ -173,25 +242,27 @@ class EPCISSequenceValidator:
     def _validate_complete_sequence(self, event_sequence: Dict[str, List], errors: List[Dict[str, str]]):
         """Validate the complete sequence of events for all EPCs"""
         for epc, steps in event_sequence.items():
-            # Sort steps by time
-            steps.sort(key=lambda x: x[1])
+            # Sort steps by time; most EPCs' steps were recorded in order already
+            if epc in self._unsorted_epcs:
+                steps.sort(key=itemgetter(1))
             
             # Check for missing steps
             current_step_idx = -1
             for step, _ in steps:
-                if step in self.EVENT_SEQUENCE:
-                    step_idx = self.EVENT_SEQUENCE.index(step)
-                    
-                    # Check if step is out of order
-                    if step_idx <= current_step_idx:
-                        add_error(errors, 'sequence', 'error',
-                                f"Out of order event for {epc}: {step} after {self.EVENT_SEQUENCE[current_step_idx]}")
-                    current_step_idx = step_idx
+                step_idx = self._STEP_ORDER.get(step)
+                if step_idx is None:
+                    continue
+                
+                # Check if step is out of order
+                if step_idx <= current_step_idx:
+                    add_error(errors, 'sequence', 'error',
+                            f"Out of order event for {epc}: {step} after {self.EVENT_SEQUENCE[current_step_idx]}")
+                current_step_idx = step_idx
             
             # Check for incomplete sequences
             if steps:
                 last_step = steps[-1][0]
-                if last_step not in ['dispensing', 'decommissioning', 'returns']:
+                if last_step not in self._TERMINAL_STEPS:
                     add_error(errors, 'sequence', 'warning',
                             f"Incomplete sequence for {epc}: ends with {last_step}")
 
@@ -1,16 +1,77 @@
 import os
+import time
 import logging
+import threading
+from functools import lru_cache
 from enum import Enum
-from typing import Dict, Any, BinaryIO, Optional
+from typing import Dict, Any, BinaryIO, Optional, Set, Tuple, Union
 from abc import ABC, abstractmethod
 import shutil
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 from io import BytesIO
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Block size for copying file objects into storage and for FTP transfers
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+# S3 clients shared by all handlers, keyed by (region, access key, secret key);
+# boto3 clients are thread-safe and keep their connection pool between requests
+_S3_CLIENTS: Dict[tuple, Any] = {}
+_S3_CLIENTS_LOCK = threading.Lock()
+_S3_MAX_POOL_CONNECTIONS = 50
+
+# Transfers at least this large go as concurrent multipart parts or ranged GETs
+_S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+_S3_MULTIPART_CHUNK_SIZE = 16 * 1024 * 1024
+_S3_MAX_CONCURRENCY = 10
+
+# Signed download URLs reused per handler, for up to half of their lifetime
+_S3_SIGNED_URL_CACHE_SIZE = 4096
+
+
+def _get_s3_client(region: str, aws_access_key: Optional[str] = None, aws_secret_key: Optional[str] = None):
+    """Return the shared S3 client for a region and set of credentials, creating it once"""
+    key = (region, aws_access_key, aws_secret_key)
+    with _S3_CLIENTS_LOCK:
+        client = _S3_CLIENTS.get(key)
+        if client is None:
+            import boto3
+            from botocore.config import Config
+            
+            config = Config(
+                max_pool_connections=_S3_MAX_POOL_CONNECTIONS,
+                tcp_keepalive=True,
+                retries={'max_attempts': 5, 'mode': 'adaptive'}
+            )
+            # If keys are provided, use them, otherwise use the AWS credentials provider chain
+            if aws_access_key and aws_secret_key:
+                client = boto3.client(
+                    's3',
+                    region_name=region,
+                    aws_access_key_id=aws_access_key,
+                    aws_secret_access_key=aws_secret_key,
+                    config=config
+                )
+            else:
+                client = boto3.client('s3', region_name=region, config=config)
+            _S3_CLIENTS[key] = client
+        return client
+
+def _parse_s3_uri(file_location: str) -> Tuple[str, str]:
+    """Split s3://bucket/key into (bucket, key)"""
+    if not file_location.startswith('s3://'):
+        raise ValueError(f"Invalid S3 URI: {file_location}")
+    bucket_name, _, s3_key = file_location[5:].partition('/')  # Remove s3:// prefix
+    return bucket_name, s3_key
+
+def _parse_ftp_uri(file_location: str) -> Tuple[str, str]:
+    """Split ftp://host/path into (host, absolute path)"""
+    if not file_location.startswith('ftp://'):
+        raise ValueError(f"Invalid FTP URI: {file_location}")
+    host, _, ftp_path = file_location[6:].partition('/')  # Remove ftp:// prefix
+    return host, '/' + ftp_path
+
 class StorageType(Enum):
     """Enum for different storage types"""
     LOCAL = "local"
@@ -21,8 +82,12 @@ class StorageHandler(ABC):
     """Abstract base class for storage handlers"""
     
     @abstractmethod
-    def store_file(self, file_content: bytes, file_name: str, supplier_id: str) -> str:
-        """Store a file and return the file location"""
+    def store_file(self, file_content: Union[bytes, BinaryIO], file_name: str, supplier_id: str) -> str:
+        """Store a file and return the file location
+        
+        file_content is either the file's bytes or a binary file object
+        positioned at the start of the data, which is streamed as is.
+        """
         pass
     
     @abstractmethod
@@ -41,23 +106,40 @@ class LocalStorageHandler(StorageHandler):
     def __init__(self, config: Dict[str, Any]):
         self.base_path = config.get('base_path', 'storage/epcis')
         self.base_path = os.path.abspath(self.base_path)
-        logger.info(f"Initializing local storage handler with base path: {self.base_path}")
+        logger.info("Initializing local storage handler with base path: %s", self.base_path)
         os.makedirs(self.base_path, exist_ok=True)
+        # Supplier directories already created, so uploads skip the makedirs stat calls
+        self._ensured_dirs: Set[str] = set()
+    
+    def _open_for_write(self, supplier_dir: str, file_path: str):
+        """Open file_path for writing, creating supplier_dir the first time it is used"""
+        if supplier_dir not in self._ensured_dirs:
+            os.makedirs(supplier_dir, exist_ok=True)
+            self._ensured_dirs.add(supplier_dir)
+        try:
+            return open(file_path, 'wb')
+        except FileNotFoundError:
+            # Removed since it was cached; create it again
+            os.makedirs(supplier_dir, exist_ok=True)
+            return open(file_path, 'wb')
     
-    def store_file(self, file_content: bytes, file_name: str, supplier_id: str) -> str:
+    def store_file(self, file_content: Union[bytes, BinaryIO], file_name: str, supplier_id: str) -> str:
         """Store a file in the local filesystem"""
         try:
             # Create supplier directory
             supplier_dir = os.path.join(self.base_path, supplier_id)
-            os.makedirs(supplier_dir, exist_ok=True)
-            logger.info(f"Storing file in directory: {supplier_dir}")
+            logger.debug("Storing file in directory: %s", supplier_dir)
             
             # Store file
             file_path = os.path.join(supplier_dir, file_name)
-            with open(file_path, 'wb') as f:
-                f.write(file_content)
-            
-            logger.info(f"File successfully stored at: {file_path}")
+            with self._open_for_write(supplier_dir, file_path) as f:
+                if isinstance(file_content, (bytes, bytearray, memoryview)):
+                    f.write(file_content)
+                else:
+                    # Stream in large blocks instead of reading the whole file into memory
+                    shutil.copyfileobj(file_content, f, _COPY_CHUNK_SIZE)
+            
+            logger.debug("File successfully stored at: %s", file_path)
             return file_path
         except Exception as e:
             logger.error(f"Error storing file locally: {str(e)}")
@@ -66,7 +148,7 @@ class LocalStorageHandler(StorageHandler):
     def retrieve_file(self, file_location: str) -> bytes:
         """Retrieve a file from the local filesystem"""
         try:
-            logger.info(f"Retrieving file from: {file_location}")
+            logger.debug("Retrieving file from: %s", file_location)
             if not os.path.exists(file_location):
                 logger.error(f"File not found: {file_location}")
                 raise FileNotFoundError(f"File not found: {file_location}")
@@ -91,7 +173,6 @@ class S3StorageHandler(StorageHandler):
     
     def __init__(self, config: Dict[str, Any]):
         try:
-            import boto3
             from botocore.exceptions import NoCredentialsError
             
             self.bucket_name = config.get('bucket_name')
@@ -104,32 +185,53 @@ class S3StorageHandler(StorageHandler):
             if not self.bucket_name:
                 raise ValueError("S3 bucket name must be provided")
             
-            # If keys are provided, use them, otherwise use the AWS credentials provider chain
+            # Shared with every other handler using the same region and credentials
+            self.s3_client = _get_s3_client(self.region, aws_access_key, aws_secret_key)
+            
+            from boto3.s3.transfer import TransferConfig
+            self.transfer_config = TransferConfig(
+                multipart_threshold=_S3_MULTIPART_THRESHOLD,
+                multipart_chunksize=_S3_MULTIPART_CHUNK_SIZE,
+                max_concurrency=_S3_MAX_CONCURRENCY,
+                io_chunksize=_COPY_CHUNK_SIZE,
+                use_threads=True
+            )
+            
+            # Per handler, as signatures depend on the client's credentials. Only
+            # with configured keys: the default provider chain may hand out
+            # temporary credentials, and a URL signed with them stops working
+            # when they expire, however long its own lifetime
+            self._signed_url = None
             if aws_access_key and aws_secret_key:
-                self.s3_client = boto3.client(
-                    's3',
-                    region_name=self.region,
-                    aws_access_key_id=aws_access_key,
-                    aws_secret_access_key=aws_secret_key
-                )
-            else:
-                self.s3_client = boto3.client('s3', region_name=self.region)
+                self._signed_url = lru_cache(maxsize=_S3_SIGNED_URL_CACHE_SIZE)(self._sign_get_url)
                 
         except (ImportError, NoCredentialsError) as e:
             logger.error(f"Error initializing S3 storage handler: {e}")
             raise
     
-    def store_file(self, file_content: bytes, file_name: str, supplier_id: str) -> str:
+    def store_file(self, file_content: Union[bytes, BinaryIO], file_name: str, supplier_id: str) -> str:
         """Store a file in S3"""
         try:
             # Create S3 key
             s3_key = f"epcis/{supplier_id}/{file_name}"
             
-            # Upload file
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=file_content
+            # Upload file: small payloads in a single PUT, large ones and streams of
+            # unknown size through the transfer manager, which splits them into parts
+            if isinstance(file_content, (bytes, bytearray, memoryview)):
+                if len(file_content) < _S3_MULTIPART_THRESHOLD:
+                    self.s3_client.put_object(
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        Body=file_content
+                    )
+                    return f"s3://{self.bucket_name}/{s3_key}"
+                file_content = BytesIO(file_content)
+            
+            self.s3_client.upload_fileobj(
+                file_content,
+                self.bucket_name,
+                s3_key,
+                Config=self.transfer_config
             )
             
             return f"s3://{self.bucket_name}/{s3_key}"
@@ -141,21 +243,13 @@ class S3StorageHandler(StorageHandler):
     def retrieve_file(self, file_location: str) -> bytes:
         """Retrieve a file from S3"""
         try:
-            # Parse S3 URI
-            if file_location.startswith('s3://'):
-                path = file_location[5:]  # Remove s3:// prefix
-                bucket_name = path.split('/')[0]
-                s3_key = '/'.join(path.split('/')[1:])
-            else:
-                raise ValueError(f"Invalid S3 URI: {file_location}")
+            bucket_name, s3_key = _parse_s3_uri(file_location)
             
-            # Download file
-            response = self.s3_client.get_object(
-                Bucket=bucket_name,
-                Key=s3_key
-            )
+            # Download file; large objects are fetched as concurrent byte ranges
+            buffer = BytesIO()
+            self.s3_client.download_fileobj(bucket_name, s3_key, buffer, Config=self.transfer_config)
             
-            return response['Body'].read()
+            return buffer.getvalue()
             
         except Exception as e:
             logger.error(f"Error retrieving file from S3: {e}")
@@ -164,30 +258,30 @@ class S3StorageHandler(StorageHandler):
     def generate_presigned_url(self, file_location: str, expiration: int = 3600) -> str:
         """Generate a pre-signed URL for S3 file access"""
         try:
-            # Parse S3 URI
-            if file_location.startswith('s3://'):
-                path = file_location[5:]  # Remove s3:// prefix
-                bucket_name = path.split('/')[0]
-                s3_key = '/'.join(path.split('/')[1:])
-            else:
-                raise ValueError(f"Invalid S3 URI: {file_location}")
-            
-            # Generate presigned URL
-            url = self.s3_client.generate_presigned_url(
-                'get_object',
-                Params={
-                    'Bucket': bucket_name,
-                    'Key': s3_key
-                },
-                ExpiresIn=expiration
-            )
+            bucket_name, s3_key = _parse_s3_uri(file_location)
             
-            return url
+            # Reuse a URL signed in the current half-lifetime window, so a cached
+            # URL always has at least half of the requested lifetime left
+            window = expiration // 2
+            if window <= 0 or self._signed_url is None:
+                return self._sign_get_url(bucket_name, s3_key, expiration, 0)
+            return self._signed_url(bucket_name, s3_key, expiration, int(time.time()) // window)
             
         except Exception as e:
             logger.error(f"Error generating presigned URL: {e}")
             raise
 
+    def _sign_get_url(self, bucket_name: str, s3_key: str, expiration: int, window_index: int) -> str:
+        """Sign a GET URL; window_index only partitions the cache"""
+        return self.s3_client.generate_presigned_url(
+            'get_object',
+            Params={
+                'Bucket': bucket_name,
+                'Key': s3_key
+            },
+            ExpiresIn=expiration
+        )
+
 class FTPStorageHandler(StorageHandler):
     """Handler for FTP file storage"""
     
@@ -203,40 +297,87 @@ class FTPStorageHandler(StorageHandler):
         
         if not self.host:
             raise ValueError("FTP host must be provided")
+        
+        # Logged-in connections per host, reused across calls; ftplib objects are
+        # not thread-safe, so every command runs under the lock
+        self._ftp_conns: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        # Remote directories already created on this server
+        self._ensured_dirs: Set[str] = set()
     
-    def store_file(self, file_content: bytes, file_name: str, supplier_id: str) -> str:
+    def _get_conn(self, host: str):
+        """Return the logged-in connection for host, reconnecting if it has dropped
+        
+        Must be called with self._lock held.
+        """
+        import ftplib
+        
+        ftp = self._ftp_conns.get(host)
+        if ftp is not None:
+            try:
+                ftp.voidcmd('NOOP')
+                return ftp
+            except ftplib.all_errors:
+                self._drop_conn(host)
+        
+        ftp = ftplib.FTP(host)
+        ftp.login(self.username, self.password)
+        self._ftp_conns[host] = ftp
+        return ftp
+    
+    def _drop_conn(self, host: str):
+        """Close and forget the connection for host; must be called with self._lock held"""
+        ftp = self._ftp_conns.pop(host, None)
+        if ftp is not None:
+            ftp.close()
+    
+    def _ensure_dir(self, ftp, remote_dir: str):
+        """Create remote_dir and its parents unless done before"""
+        import ftplib
+        
+        if remote_dir in self._ensured_dirs:
+            return
+        current_dir = ''
+        for directory in remote_dir.split('/'):
+            if not directory:
+                continue
+                
+            current_dir += '/' + directory
+            
+            try:
+                ftp.cwd(current_dir)
+            except ftplib.error_perm:
+                ftp.mkd(current_dir)
+        self._ensured_dirs.add(remote_dir)
+    
+    def store_file(self, file_content: Union[bytes, BinaryIO], file_name: str, supplier_id: str) -> str:
         """Store a file in FTP server"""
         try:
             import ftplib
             
-            # Create FTP connection
-            ftp = ftplib.FTP(self.host)
-            ftp.login(self.username, self.password)
-            
-            # Navigate to target directory
-            target_dir = os.path.join(self.base_dir, 'epcis', supplier_id).replace('\\', '/')
+            # Remote paths are POSIX whatever the local OS
+            target_dir = str(PurePosixPath(self.base_dir, 'epcis', supplier_id))
+            # Directories are created from the server root, so upload by absolute path
+            remote_dir = '/' + '/'.join(d for d in target_dir.split('/') if d)
             
-            # Create directories if they don't exist
-            dirs_to_create = target_dir.split('/')
-            current_dir = ''
+            if isinstance(file_content, (bytes, bytearray, memoryview)):
+                file_content = BytesIO(file_content)
             
-            for directory in dirs_to_create:
-                if not directory:
-                    continue
-                    
-                current_dir += '/' + directory
-                
+            with self._lock:
+                ftp = self._get_conn(self.host)
                 try:
-                    ftp.cwd(current_dir)
+                    # Create directories if they don't exist
+                    self._ensure_dir(ftp, remote_dir)
+                    
+                    # Upload file
+                    ftp.storbinary(f"STOR {remote_dir.rstrip('/')}/{file_name}", file_content, blocksize=_COPY_CHUNK_SIZE)
                 except ftplib.error_perm:
-                    ftp.mkd(current_dir)
-                    ftp.cwd(current_dir)
-            
-            # Upload file
-            ftp.storbinary(f"STOR {file_name}", BytesIO(file_content))
-            
-            # Close connection
-            ftp.quit()
+                    # The server answered; the connection is still usable
+                    raise
+                except Exception:
+                    # Unknown connection state; start over on the next call
+                    self._drop_conn(self.host)
+                    raise
             
             return f"ftp://{self.host}/{target_dir}/{file_name}"
             
@@ -251,26 +392,22 @@ class FTPStorageHandler(StorageHandler):
         """Retrieve a file from FTP server"""
         try:
             import ftplib
-            from io import BytesIO
-            
-            # Parse FTP URI
-            if file_location.startswith('ftp://'):
-                path = file_location[6:]  # Remove ftp:// prefix
-                host = path.split('/')[0]
-                ftp_path = '/' + '/'.join(path.split('/')[1:])
-            else:
-                raise ValueError(f"Invalid FTP URI: {file_location}")
             
-            # Create FTP connection
-            ftp = ftplib.FTP(host)
-            ftp.login(self.username, self.password)
+            host, ftp_path = _parse_ftp_uri(file_location)
             
             # Download file
             buffer = BytesIO()
-            ftp.retrbinary(f"RETR {ftp_path}", buffer.write)
-            
-            # Close connection
-            ftp.quit()
+            with self._lock:
+                ftp = self._get_conn(host)
+                try:
+                    ftp.retrbinary(f"RETR {ftp_path}", buffer.write, blocksize=_COPY_CHUNK_SIZE)
+                except ftplib.error_perm:
+                    # The server answered; the connection is still usable
+                    raise
+                except Exception:
+                    # Unknown connection state; start over on the next call
+                    self._drop_conn(host)
+                    raise
             
             return buffer.getvalue()
             
@@ -286,8 +423,7 @@ class FTPStorageHandler(StorageHandler):
         try:
             # Parse FTP path
             if file_location.startswith('ftp://'):
-                path = file_location[6:]  # Remove ftp:// prefix
-                file_name = path.split('/')[-1]
+                file_name = file_location.rpartition('/')[2]
             else:
                 file_name = os.path.basename(file_location)
             
@@ -304,13 +440,27 @@ class FTPStorageHandler(StorageHandler):
             logger.error(f"Error generating URL for FTP file: {e}")
             raise
 
+_HANDLERS = {
+    StorageType.LOCAL: LocalStorageHandler,
+    StorageType.S3: S3StorageHandler,
+    StorageType.FTP: FTPStorageHandler,
+}
+
+@lru_cache(maxsize=8)
+def _cached_handler(storage_type: StorageType, config_items: Tuple[Tuple[str, Any], ...]) -> StorageHandler:
+    """Build one handler per storage type and configuration"""
+    return _HANDLERS[storage_type](dict(config_items))
+
 def get_storage_handler(storage_type: StorageType, config: Dict[str, Any]) -> StorageHandler:
-    """Factory function to get the appropriate storage handler"""
-    if storage_type == StorageType.LOCAL:
-        return LocalStorageHandler(config)
-    elif storage_type == StorageType.S3:
-        return S3StorageHandler(config)
-    elif storage_type == StorageType.FTP:
-        return FTPStorageHandler(config)
-    else:
-        raise ValueError(f"Unsupported storage type: {storage_type}")
\ No newline at end of file
+    """Factory function to get the appropriate storage handler
+    
+    Handlers are shared between calls with the same type and configuration,
+    so clients, connections and directory caches are set up once.
+    """
+    if storage_type not in _HANDLERS:
+        raise ValueError(f"Unsupported storage type: {storage_type}")
+    try:
+        return _cached_handler(storage_type, tuple(sorted(config.items())))
+    except TypeError:
+        # Unhashable config values; build an uncached handler
+        return _HANDLERS[storage_type](config)
\ No newline at end of file
@@ -1,28 +1,87 @@
 import os
 import uuid
+import asyncio
 import logging
 import hashlib
 import re
-import json
+import threading
+import weakref
+from bisect import bisect_right
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Dict, Any, Optional, Tuple
+from io import BytesIO
+from itertools import accumulate
+from typing import AsyncIterator, Dict, Any, Optional, Tuple
 from backend.models.epcis_submission import EPCISSubmission, ValidationError, FileStatus, ValidEPCISSubmission, ErroredEPCISSubmission
 from backend.models.supplier import Supplier
 from backend.models.base import SessionLocal
 from . import EPCISValidator
+from .utils import loads_json
 from  . storage_handlers import LocalStorageHandler, S3StorageHandler
-import xml.etree.ElementTree as ET
+from sqlalchemy import or_
+import lxml.etree as ET
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Filename patterns tried in order when extracting the vendor name
+_VENDOR_FILENAME_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'EPCIS[._-]([^._-]+)',  # Match EPCIS[-._]VENDORNAME
+    r'EPCIS_([^_]+)_',       # Match EPCIS_VENDORNAME_
+    r'([^_]+)_EPCIS_',       # Match VENDORNAME_EPCIS_
+    r'([^_]+)_[0-9]+\.xml',  # Match VENDORNAME_12345.xml
+    r'^([A-Za-z0-9]+)[._-]', # Match starting with VENDORNAME
+))
+_SGTIN_FORMAT_RE = re.compile(r"^urn:epc:id:sgtin:(\d+)\.(\d+)\.([A-Za-z0-9]{1,20})$")
+_XML_SGTIN_RE = re.compile(r'urn:epc:id:sgtin:[^<"\s]+')
+_JSON_SGTIN_RE = re.compile(r'"urn:epc:id:sgtin:[^"]+')
+
+# Seconds between attempts to take a submission lock held by an identical upload
+_SUBMISSION_LOCK_POLL_INTERVAL = 0.05
+
+# Columns a duplicate check reads from the original submission
+_DUPLICATE_COLUMNS = (
+    EPCISSubmission.id,
+    EPCISSubmission.file_name,
+    EPCISSubmission.submission_date,
+    EPCISSubmission.status,
+    EPCISSubmission.instance_identifier,
+)
+
+# _find_xml_error_lines keys and the substrings that mark them, in the order
+# the keys are checked on a line
+_XML_LINE_MARKERS = (
+    ('event', ('<ObjectEvent>', '<AggregationEvent>')),
+    ('eventTime', ('eventTime',)),
+    ('eventTimeZoneOffset', ('eventTimeZoneOffset',)),
+    ('action', ('action',)),
+    ('epc', ('<epc>',)),
+    ('bizStep', ('<bizStep>',)),
+    ('epcList', ('<epcList>',)),
+    ('bizTransactionList', ('<bizTransactionList>',)),
+)
+
+# InstanceIdentifier in the EPCIS 1.x namespace, preferred over an unqualified one
+_EPCIS_INSTANCE_ID_TAG = '{urn:gs1:epcis:epcis:xsd:1}InstanceIdentifier'
+
+
+def _sha256_hexdigest(file_content: bytes) -> str:
+    """SHA-256 of a submission; hashlib releases the GIL while hashing"""
+    return hashlib.sha256(file_content).hexdigest()
+
 class SubmissionService:
     """Service for handling EPCIS file submissions"""
     
     def __init__(self):
         self.validator = EPCISValidator()
+        # Validation runs in worker threads; the validator keeps sequence state
+        # across documents, so only one document is validated at a time
+        self._validation_lock = threading.Lock()
+        # Per file hash and per instance identifier, held from the duplicate
+        # check until the submission is committed; dropped once unused. Thread
+        # locks, as the file watcher submits from its own event loop
+        self._submission_locks: 'weakref.WeakValueDictionary[Tuple[str, str], threading.Lock]' = weakref.WeakValueDictionary()
+        self._submission_locks_lock = threading.Lock()
         
         # Initialize storage handler based on configuration
         storage_type = os.getenv('STORAGE_TYPE', 'local').lower()
@@ -42,19 +101,11 @@ class SubmissionService:
     
     def extract_vendor_from_filename(self, filename: str) -> Optional[str]:
         """Extract vendor name from filename following the pattern EPCIS_VENDORNAME_*"""
-        patterns = [
-            r'EPCIS[._-]([^._-]+)',  # Match EPCIS[-._]VENDORNAME
-            r'EPCIS_([^_]+)_',       # Match EPCIS_VENDORNAME_
-            r'([^_]+)_EPCIS_',       # Match VENDORNAME_EPCIS_
-            r'([^_]+)_[0-9]+\.xml',  # Match VENDORNAME_12345.xml
-            r'^([A-Za-z0-9]+)[._-]', # Match starting with VENDORNAME
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, filename, re.IGNORECASE)
+        for pattern in _VENDOR_FILENAME_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 vendor_name = match.group(1).upper()
-                logger.info(f"Extracted vendor name '{vendor_name}' from filename: {filename}")
+                logger.debug("Extracted vendor name '%s' from filename: %s", vendor_name, filename)
                 return vendor_name
         
         logger.warning(f"Could not extract vendor name from filename: {filename}")
@@ -62,13 +113,11 @@ class SubmissionService:
     
     def get_or_create_supplier(self, supplier_id: str, db) -> Supplier:
         """Get an existing supplier or create a new one"""
-        supplier = db.query(Supplier).filter_by(id=supplier_id).first()
+        # Match by id or by name in one query, preferring the id match
+        supplier = db.query(Supplier).filter(
+            or_(Supplier.id == supplier_id, Supplier.name == supplier_id)
+        ).order_by((Supplier.id == supplier_id).desc()).first()
         if not supplier:
-            # Check if we have a supplier with this name
-            supplier = db.query(Supplier).filter_by(name=supplier_id).first()
-            if supplier:
-                return supplier
-                
             # Create new supplier with id as supplier_<name>
             normalized_id = supplier_id.lower().replace(' ', '_')
             new_id = f"supplier_{normalized_id}"
@@ -84,7 +133,7 @@ class SubmissionService:
             )
             db.add(supplier)
             db.commit()
-            logger.info(f"Created new supplier: {supplier_id} with ID {new_id}")
+            logger.info("Created new supplier: %s with ID %s", supplier_id, new_id)
         return supplier
 
     def find_error_line_numbers(self, file_content: bytes, is_xml: bool) -> Dict[str, int]:
@@ -102,30 +151,23 @@ class SubmissionService:
         line_numbers = {}
         try:
             content_str = file_content.decode('utf-8')
-            lines = content_str.splitlines()
+            # Offset each line starts at, splitting where splitlines() does
+            line_starts = list(accumulate(map(len, content_str.splitlines(keepends=True)), initial=0))
             
-            for i, line in enumerate(lines, 1):
-                # Store line numbers by content for better error matching
-                if '<ObjectEvent>' in line or '<AggregationEvent>' in line:
-                    line_numbers['event'] = i
-                
-                # Mark locations of required fields
-                if 'eventTime' in line:
-                    line_numbers['eventTime'] = i
-                if 'eventTimeZoneOffset' in line:
-                    line_numbers['eventTimeZoneOffset'] = i
-                if 'action' in line:
-                    line_numbers['action'] = i
-                if '<epc>' in line:
-                    line_numbers['epc'] = i
-                if '<bizStep>' in line:
-                    line_numbers['bizStep'] = i
-
-                # Store parent element line numbers
-                if '<epcList>' in line:
-                    line_numbers['epcList'] = i
-                if '<bizTransactionList>' in line:
-                    line_numbers['bizTransactionList'] = i
+            # Each key records the last line holding one of its markers. Search
+            # the whole text for the first and last occurrence instead of
+            # testing every line; keys are ordered as a line-by-line scan
+            # would first have set them
+            found = []
+            for order, (key, markers) in enumerate(_XML_LINE_MARKERS):
+                first = [pos for pos in map(content_str.find, markers) if pos >= 0]
+                if not first:
+                    continue
+                last = max(map(content_str.rfind, markers))
+                found.append((bisect_right(line_starts, min(first)), order, key, bisect_right(line_starts, last)))
+            found.sort()
+            for _, _, key, line in found:
+                line_numbers[key] = line
 
         except Exception as e:
             logger.error(f"Error processing XML for line numbers: {str(e)}")
@@ -171,8 +213,7 @@ class SubmissionService:
         
         Returns True if valid, otherwise False.
         """
-        pattern = r"^urn:epc:id:sgtin:(\d+)\.(\d+)\.([A-Za-z0-9]{1,20})$"
-        return bool(re.match(pattern, sgtin_str))
+        return bool(_SGTIN_FORMAT_RE.match(sgtin_str))
     
     def _extract_sgtin_identifiers(self, file_content, is_xml):
         """Extract SGTIN identifiers from file for pre-validation"""
@@ -180,11 +221,10 @@ class SubmissionService:
         try:
             content_str = file_content.decode('utf-8')
             if is_xml:
-                # Extraction using regex from top-level import
-                matches = re.findall(r'urn:epc:id:sgtin:[^<"\s]+', content_str)
+                matches = _XML_SGTIN_RE.findall(content_str)
                 sgtins.extend(matches)
             else:
-                matches = re.findall(r'"urn:epc:id:sgtin:[^"]+', content_str)
+                matches = _JSON_SGTIN_RE.findall(content_str)
                 sgtins = [m.strip('"') for m in matches]
             
             return sgtins
@@ -194,21 +234,33 @@ class SubmissionService:
 
     def extract_instance_identifier(self, file_content: bytes) -> Optional[str]:
         """Extract InstanceIdentifier from EPCIS document"""
+        # One scan settles the common case of a document without the element;
+        # the markers checked below all contain this name
+        if b'InstanceIdentifier' not in file_content:
+            return None
         try:
-            content_str = file_content.decode('utf-8')
-            
+            # The markers are ASCII, so look for them in the raw bytes rather
+            # than decoding a copy of the whole document first
+
             # For XML files
-            if '<ns2:InstanceIdentifier>' in content_str or '<InstanceIdentifier>' in content_str:
-                root = ET.fromstring(content_str)
-                # Search for InstanceIdentifier with and without namespace
-                for ns in ['{urn:gs1:epcis:epcis:xsd:1}', '']:
-                    instance_id = root.find(f'.//{ns}InstanceIdentifier')
-                    if instance_id is not None:
+            if b'<ns2:InstanceIdentifier>' in file_content or b'<InstanceIdentifier>' in file_content:
+                # Stream through the document for InstanceIdentifier with and
+                # without namespace; a namespaced one anywhere takes precedence
+                # over a plain one, so only that match ends the parse early
+                plain_id = None
+                for _, instance_id in ET.iterparse(BytesIO(file_content), events=('end',),
+                                                   tag=(_EPCIS_INSTANCE_ID_TAG, 'InstanceIdentifier')):
+                    if instance_id.getparent() is None:
+                        continue  # the root element itself
+                    if instance_id.tag == _EPCIS_INSTANCE_ID_TAG:
                         return instance_id.text
+                    if plain_id is None:
+                        plain_id = instance_id.text
+                return plain_id
             
             # For JSON files (if you support JSON format)
-            elif '"InstanceIdentifier":' in content_str:
-                data = json.loads(content_str)
+            elif b'"InstanceIdentifier":' in file_content:
+                data = loads_json(file_content)
                 if 'DocumentIdentification' in data:
                     return data['DocumentIdentification'].get('InstanceIdentifier')
             
@@ -217,28 +269,171 @@ class SubmissionService:
             logger.error(f"Error extracting InstanceIdentifier: {str(e)}")
             return None
 
-    def check_duplicate_submission(self, file_hash: str, instance_identifier: Optional[str], db) -> Tuple[Optional[EPCISSubmission], str]:
-        """Check for duplicate submission using both file hash and instance identifier"""
+    def _validate_document(self, file_content: bytes, is_xml: bool) -> Dict[str, Any]:
+        """Validate a document; run off the event loop via run_in_executor"""
+        with self._validation_lock:
+            return self.validator.validate_document(file_content, is_xml=is_xml)
+
+    @asynccontextmanager
+    async def _submission_guard(self, file_hash: str, instance_identifier: Optional[str]) -> AsyncIterator[None]:
+        """Hold the locks for a submission's file hash and instance identifier
+        
+        process_submission awaits between its duplicate check and the insert,
+        so identical uploads would otherwise both pass the check. The hash
+        lock is always taken first, so two uploads never wait on each other
+        crosswise. A busy lock is polled rather than waited on, so the event
+        loop keeps running and a cancelled upload never ends up holding it.
+        """
+        keys = [('file_hash', file_hash)]
+        if instance_identifier:
+            keys.append(('instance_identifier', instance_identifier))
+        # Referenced here while held; the weak map forgets a lock once no
+        # submission is using it
+        with self._submission_locks_lock:
+            locks = []
+            for key in keys:
+                lock = self._submission_locks.get(key)
+                if lock is None:
+                    lock = self._submission_locks[key] = threading.Lock()
+                locks.append(lock)
+        acquired = []
+        try:
+            for lock in locks:
+                while not lock.acquire(blocking=False):
+                    await asyncio.sleep(_SUBMISSION_LOCK_POLL_INTERVAL)
+                acquired.append(lock)
+            yield
+        finally:
+            for lock in reversed(acquired):
+                lock.release()
+
+    def check_duplicate_submission(self, file_hash: str, instance_identifier: Optional[str], db) -> Tuple[Optional[Any], str]:
+        """Check for duplicate submission using both file hash and instance identifier
+        
+        Only the _DUPLICATE_COLUMNS of the original are loaded, as a row with
+        attribute access.
+        """
         if instance_identifier:
             # First check by instance identifier as it's more reliable
-            existing = db.query(EPCISSubmission).filter_by(instance_identifier=instance_identifier).first()
+            existing = db.query(*_DUPLICATE_COLUMNS).filter(
+                EPCISSubmission.instance_identifier == instance_identifier).first()
             if existing:
-                logger.info(f"Duplicate detected by instance identifier: {instance_identifier}")
-                logger.info(f"Original submission: ID={existing.id}, File={existing.file_name}, Date={existing.submission_date}")
+                logger.info("Duplicate detected by instance identifier: %s", instance_identifier)
+                logger.info("Original submission: ID=%s, File=%s, Date=%s", existing.id, existing.file_name, existing.submission_date)
                 return existing, "instance_identifier"
         
         # Fallback to file hash check
-        existing = db.query(EPCISSubmission).filter_by(file_hash=file_hash).first()
+        existing = db.query(*_DUPLICATE_COLUMNS).filter(EPCISSubmission.file_hash == file_hash).first()
         if existing:
-            logger.info(f"Duplicate detected by file hash: {file_hash}")
-            logger.info(f"Original submission: ID={existing.id}, File={existing.file_name}, Date={existing.submission_date}")
+            logger.info("Duplicate detected by file hash: %s", file_hash)
+            logger.info("Original submission: ID=%s, File=%s, Date=%s", existing.id, existing.file_name, existing.submission_date)
             return existing, "content_hash"
             
         return None, ""
 
+    @staticmethod
+    def _add_and_commit(db, *instances) -> None:
+        """Add instances to the session and commit; run off the event loop via run_in_executor"""
+        db.add_all(instances)
+        db.commit()
+
+    def _record_validation(self, db, submission: EPCISSubmission, validation_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Store validation results for a submission and build the response
+        
+        Runs off the event loop via run_in_executor, as it commits and reads
+        back the committed submission.
+        """
+        # Update submission based on validation results, counting in a single pass
+        error_count = warning_count = 0
+        has_structure_errors = has_sequence_errors = False
+        for error in validation_results.get('errors', []):
+            severity = error['severity']
+            if severity == 'error':
+                error_count += 1
+            elif severity == 'warning':
+                warning_count += 1
+            error_type = error['type']
+            if error_type == 'structure':
+                has_structure_errors = True
+            elif error_type == 'sequence':
+                has_sequence_errors = True
+        submission.error_count = error_count
+        submission.warning_count = warning_count
+        submission.has_structure_errors = has_structure_errors
+        submission.has_sequence_errors = has_sequence_errors
+        submission.is_valid = submission.error_count == 0
+        submission.status = FileStatus.VALIDATED.value if submission.is_valid else FileStatus.FAILED.value
+        submission.processing_date = datetime.utcnow()
+
+        # Create validation error records, as one executemany INSERT rather
+        # than one ORM object and statement per error
+        db.bulk_insert_mappings(ValidationError, [
+            {
+                'id': str(uuid.uuid4()),
+                'submission_id': submission.id,
+                'error_type': error['type'],
+                'severity': error['severity'],
+                'message': error['message'],
+                'line_number': error.get('line_number')
+            }
+            for error in validation_results.get('errors', [])
+        ])
+
+        # Create valid or errored submission record
+        if submission.is_valid:
+            valid_submission = ValidEPCISSubmission(
+                id=str(uuid.uuid4()),
+                master_submission_id=submission.id,
+                supplier_id=submission.supplier_id,
+                file_name=submission.file_name,
+                file_path=submission.file_path,
+                file_size=submission.file_size,
+                warning_count=submission.warning_count
+            )
+            db.add(valid_submission)
+            submission.valid_submission_id = valid_submission.id
+            logger.debug("Valid submission record created: %s", valid_submission.id)
+        else:
+            errored_submission = ErroredEPCISSubmission(
+                id=str(uuid.uuid4()),
+                master_submission_id=submission.id,
+                supplier_id=submission.supplier_id,
+                file_name=submission.file_name,
+                file_path=submission.file_path,
+                file_size=submission.file_size,
+                error_count=submission.error_count,
+                warning_count=submission.warning_count,
+                has_structure_errors=submission.has_structure_errors,
+                has_sequence_errors=submission.has_sequence_errors
+            )
+            db.add(errored_submission)
+            submission.errored_submission_id = errored_submission.id
+
+        submission.completion_date = datetime.utcnow()
+        db.commit()
+        
+        logger.info("Validation records saved for submission: %s", submission.id)
+        
+        return {
+            'success': True,
+            'status_code': 200,
+            'message': 'File processed successfully',
+            'submission_id': submission.id,
+            'is_valid': submission.is_valid,
+            'error_count': submission.error_count,
+            'warning_count': submission.warning_count
+        }
+
     async def process_submission(self, file_content: bytes, file_name: str, supplier_id: Optional[str] = None) -> Dict[str, Any]:
-        """Process an EPCIS file submission"""
+        """Process an EPCIS file submission
+        
+        The session is synchronous, so every query and commit runs in the
+        default executor, like hashing and validation, and the event loop
+        keeps serving other requests meanwhile.
+        """
         db = SessionLocal()
+        loop = asyncio.get_running_loop()
+        submission = None
         try:
             # Extract supplier ID from filename if not provided
             if not supplier_id:
@@ -250,152 +445,90 @@ class SubmissionService:
                         'message': 'Could not determine supplier ID from filename'
                     }
 
-            # Extract instance identifier from document
-            instance_identifier = self.extract_instance_identifier(file_content)
+            # Extract the instance identifier and hash the file side by side in
+            # worker threads; both read the same buffer, and hashlib releases
+            # the GIL while hashing
+            instance_identifier, file_hash = await asyncio.gather(
+                loop.run_in_executor(None, self.extract_instance_identifier, file_content),
+                loop.run_in_executor(None, _sha256_hexdigest, file_content),
+            )
             if instance_identifier:
-                logger.info(f"Extracted instance identifier from file: {instance_identifier}")
-            
-            # Calculate file hash
-            file_hash = hashlib.sha256(file_content).hexdigest()
-            logger.info(f"Calculated file hash: {file_hash}")
-
-            # Check for duplicate submission using both methods
-            existing_submission, duplicate_type = self.check_duplicate_submission(file_hash, instance_identifier, db)
-            if existing_submission:
-                return {
-                    'success': False,
-                    'status_code': 409,
-                    'message': 'Duplicate submission detected',
-                    'detail': {
-                        'duplicate_type': duplicate_type,
-                        'instance_identifier': instance_identifier,
-                        'original_submission': {
-                            'id': existing_submission.id,
-                            'file_name': existing_submission.file_name,
-                            'submission_date': existing_submission.submission_date.isoformat() if existing_submission.submission_date else None,
-                            'status': existing_submission.status,
-                            'instance_identifier': existing_submission.instance_identifier
+                logger.debug("Extracted instance identifier from file: %s", instance_identifier)
+            logger.debug("Calculated file hash: %s", file_hash)
+
+            # Identical uploads are checked and inserted one at a time
+            async with self._submission_guard(file_hash, instance_identifier):
+                # Check for duplicate submission using both methods
+                existing_submission, duplicate_type = await loop.run_in_executor(
+                    None, self.check_duplicate_submission, file_hash, instance_identifier, db)
+                if existing_submission:
+                    return {
+                        'success': False,
+                        'status_code': 409,
+                        'message': 'Duplicate submission detected',
+                        'detail': {
+                            'duplicate_type': duplicate_type,
+                            'instance_identifier': instance_identifier,
+                            'original_submission': {
+                                'id': existing_submission.id,
+                                'file_name': existing_submission.file_name,
+                                'submission_date': existing_submission.submission_date.isoformat() if existing_submission.submission_date else None,
+                                'status': existing_submission.status,
+                                'instance_identifier': existing_submission.instance_identifier
+                            }
                         }
                     }
-                }
-
-            # Get or create supplier
-            supplier = self.get_or_create_supplier(supplier_id, db)
-            if not supplier:
-                return {
-                    'success': False,
-                    'status_code': 400,
-                    'message': f'Invalid supplier ID: {supplier_id}'
-                }
-
-            # Store the file
-            try:
-                file_path = self.storage.store_file(
-                    file_content=file_content,
-                    file_name=file_name,
-                    supplier_id=supplier.id
-                )
-                file_size = len(file_content)
-            except Exception as e:
-                logger.error(f"Error storing file: {str(e)}")
-                return {
-                    'success': False,
-                    'status_code': 500,
-                    'message': f'Error storing file: {str(e)}'
-                }
-
-            # Create submission record with instance identifier
-            submission = EPCISSubmission(
-                id=str(uuid.uuid4()),
-                supplier_id=supplier.id,
-                file_name=file_name,
-                file_path=file_path,
-                file_size=file_size,
-                file_hash=file_hash,
-                instance_identifier=instance_identifier,  # Store the instance identifier
-                status=FileStatus.RECEIVED.value
-            )
-            db.add(submission)
-            db.commit()
 
-            # Validate the file
-            validation_results = self.validator.validate_document(file_content, is_xml=file_name.lower().endswith('.xml'))
-            
-            # Update submission based on validation results
-            submission.error_count = len([e for e in validation_results.get('errors', []) if e['severity'] == 'error'])
-            submission.warning_count = len([e for e in validation_results.get('errors', []) if e['severity'] == 'warning'])
-            submission.has_structure_errors = any(e['type'] == 'structure' for e in validation_results.get('errors', []))
-            submission.has_sequence_errors = any(e['type'] == 'sequence' for e in validation_results.get('errors', []))
-            submission.is_valid = submission.error_count == 0
-            submission.status = FileStatus.VALIDATED.value if submission.is_valid else FileStatus.FAILED.value
-            submission.processing_date = datetime.utcnow()
-
-            # Create validation error records
-            for error in validation_results.get('errors', []):
-                validation_error = ValidationError(
-                    id=str(uuid.uuid4()),
-                    submission_id=submission.id,
-                    error_type=error['type'],
-                    severity=error['severity'],
-                    message=error['message'],
-                    line_number=error.get('line_number')
-                )
-                db.add(validation_error)
+                # Get or create supplier
+                supplier = await loop.run_in_executor(None, self.get_or_create_supplier, supplier_id, db)
+                if not supplier:
+                    return {
+                        'success': False,
+                        'status_code': 400,
+                        'message': f'Invalid supplier ID: {supplier_id}'
+                    }
 
-            # Create valid or errored submission record
-            if submission.is_valid:
-                valid_submission = ValidEPCISSubmission(
-                    id=str(uuid.uuid4()),
-                    master_submission_id=submission.id,
-                    supplier_id=supplier.id,
-                    file_name=file_name,
-                    file_path=file_path,
-                    file_size=file_size,
-                    warning_count=submission.warning_count
-                )
-                db.add(valid_submission)
-                submission.valid_submission_id = valid_submission.id
-                logger.info(f"Valid submission record created: {valid_submission.id}")
-            else:
-                errored_submission = ErroredEPCISSubmission(
+                # Store the file
+                try:
+                    file_path = await loop.run_in_executor(
+                        None, self.storage.store_file, file_content, file_name, supplier.id)
+                    file_size = len(file_content)
+                except Exception as e:
+                    logger.error(f"Error storing file: {str(e)}")
+                    return {
+                        'success': False,
+                        'status_code': 500,
+                        'message': f'Error storing file: {str(e)}'
+                    }
+
+                # Create submission record with instance identifier
+                submission = EPCISSubmission(
                     id=str(uuid.uuid4()),
-                    master_submission_id=submission.id,
                     supplier_id=supplier.id,
                     file_name=file_name,
                     file_path=file_path,
                     file_size=file_size,
-                    error_count=submission.error_count,
-                    warning_count=submission.warning_count,
-                    has_structure_errors=submission.has_structure_errors,
-                    has_sequence_errors=submission.has_sequence_errors
+                    file_hash=file_hash,
+                    instance_identifier=instance_identifier,  # Store the instance identifier
+                    status=FileStatus.RECEIVED.value
                 )
-                db.add(errored_submission)
-                submission.errored_submission_id = errored_submission.id
+                await loop.run_in_executor(None, self._add_and_commit, db, submission)
 
-            submission.completion_date = datetime.utcnow()
-            db.commit()
+            # Validate the file in a worker thread so other requests keep being served
+            validation_results = await loop.run_in_executor(
+                None, self._validate_document, file_content, file_name.lower().endswith('.xml'))
             
-            logger.info(f"Validation records saved for submission: {submission.id}")
-            
-            return {
-                'success': True,
-                'status_code': 200,
-                'message': 'File processed successfully',
-                'submission_id': submission.id,
-                'is_valid': submission.is_valid,
-                'error_count': submission.error_count,
-                'warning_count': submission.warning_count
-            }
+            return await loop.run_in_executor(None, self._record_validation, db, submission, validation_results)
 
         except Exception as e:
             logger.error(f"Uncaught exception in process_submission: {str(e)}")
             logger.exception(e)
-            if 'submission' in locals() and submission.id:
+            if submission is not None:
                 try:
                     submission.status = FileStatus.FAILED.value
                     submission.completion_date = datetime.utcnow()
-                    db.commit()
-                except:
+                    await loop.run_in_executor(None, db.commit)
+                except Exception:
                     pass
             return {
                 'success': False,
@@ -403,4 +536,4 @@ class SubmissionService:
                 'message': f'Internal server error: {str(e)}'
             }
         finally:
-            db.close()
\ No newline at end of file
+            await loop.run_in_executor(None, db.close)
\ No newline at end of file
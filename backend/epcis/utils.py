@@ -1,10 +1,19 @@
+import json
 import logging
+import re
 from collections import defaultdict
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib json module is used without it
+    orjson = None
+
 logger = logging.getLogger("epcis.utils")
 
+_NAMESPACE_RE = re.compile(r'xmlns(?:\:\w+)?=[\"\']([^\"\']+)[\"\']')
+
 
 class ErrorAggregator:
     def __init__(self):
@@ -131,8 +140,7 @@ def extract_namespaces(xml_string: str) -> List[str]:
     Returns:
         List of namespace URIs
     """
-    import re
-    ns_matches = re.findall(r'xmlns(?:\:\w+)?=[\"\']([^\"\']+)[\"\']', xml_string)
+    ns_matches = _NAMESPACE_RE.findall(xml_string)
     if ns_matches:
         logger.debug(f"Extracted {len(ns_matches)} namespaces from XML")
     else:
@@ -158,8 +166,30 @@ def add_error(errors: List[Dict[str, Any]], error_type: str, severity: str, mess
         error['line_number'] = line_number
     errors.append(error)
     
-    # Also log the error using our logging system
+    # Also log the error using our logging system; the message is only
+    # formatted if a handler is going to emit it
     if severity == 'error':
-        logger.error(f"{error_type}: {message}")
+        logger.error("%s: %s", error_type, message)
     else:
-        logger.warning(f"{error_type}: {message}")
\ No newline at end of file
+        logger.warning("%s: %s", error_type, message)
+
+def loads_json(content: bytes) -> Any:
+    """Decode a JSON document, using orjson when it is installed
+
+    Args:
+        content: Raw JSON content
+
+    Returns:
+        Decoded JSON value
+
+    Raises:
+        json.JSONDecodeError: If the content is not valid JSON
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than the stdlib (NaN, >64-bit ints, non-UTF-8 input);
+            # let json decide so accepted documents and error messages stay the same
+            pass
+    return json.loads(content)
@@ -4,9 +4,10 @@ import threading
 from pathlib import Path
 from typing import Dict, Optional, Any
 import uuid
+from operator import attrgetter
 from fastapi import FastAPI, HTTPException, BackgroundTasks, File, UploadFile, Form, Depends, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import func
 from .models.base import SessionLocal, engine, Base
 from .models.supplier import Supplier
@@ -19,6 +20,21 @@ from .epcis import EPCISValidator  # Updated import path
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Response keys for a ValidationError row and the attributes they are read from
+_ERROR_KEYS = ("id", "type", "severity", "message", "line_number",
+               "is_resolved", "resolution_note", "resolved_at", "resolved_by")
+_error_fields = attrgetter("id", "error_type", "severity", "message", "line_number",
+                           "is_resolved", "resolution_note", "resolved_at", "resolved_by")
+
+def _error_to_dict(error: ValidationError) -> Dict[str, Any]:
+    """Serialize a ValidationError row for API responses"""
+    result = dict(zip(_ERROR_KEYS, _error_fields(error)))
+    if result["resolved_at"]:
+        result["resolved_at"] = result["resolved_at"].isoformat()
+    else:
+        result["resolved_at"] = None
+    return result
+
 # Initialize FastAPI app
 app = FastAPI(title="Vendor Scorecard API")
 
@@ -555,34 +571,23 @@ async def get_submission_validation(
 ) -> Dict[str, Any]:
     """Get validation results for a submission"""
     try:
-        submission = db.query(EPCISSubmission).filter_by(id=submission_id).first()
+        # Load the submission together with its validation errors in one query
+        submission = db.query(EPCISSubmission).options(
+            joinedload(EPCISSubmission.validation_errors)
+        ).filter_by(id=submission_id).first()
         if not submission:
             raise HTTPException(
                 status_code=404,
                 detail=f"Submission {submission_id} not found"
             )
 
-        # Get validation errors
-        validation_errors = db.query(ValidationError).filter_by(submission_id=submission_id).all()
+        validation_errors = submission.validation_errors
         
         return {
             "status": submission.status,
             "error_count": submission.error_count,
             "warning_count": submission.warning_count,
-            "errors": [
-                {
-                    "id": error.id,
-                    "type": error.error_type,
-                    "severity": error.severity,
-                    "message": error.message,
-                    "line_number": error.line_number,
-                    "is_resolved": error.is_resolved,
-                    "resolution_note": error.resolution_note,
-                    "resolved_at": error.resolved_at.isoformat() if error.resolved_at else None,
-                    "resolved_by": error.resolved_by
-                }
-                for error in validation_errors
-            ]
+            "errors": [_error_to_dict(error) for error in validation_errors]
         }
     except HTTPException as http_error:
         raise http_error
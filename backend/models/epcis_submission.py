@@ -26,8 +26,8 @@ class EPCISSubmission(Base):
     file_name = Column(String(255), nullable=False)
     file_path = Column(String(500), nullable=False)  # Storage location
     file_size = Column(Integer, nullable=False)
-    file_hash = Column(String(64), nullable=False)  # For deduplication
-    instance_identifier = Column(String(255), nullable=True)  # Unique document instance identifier
+    file_hash = Column(String(64), nullable=False, index=True)  # For deduplication
+    instance_identifier = Column(String(255), nullable=True, index=True)  # Unique document instance identifier
     
     # Processing status
     status = Column(String(20), nullable=False, default=FileStatus.RECEIVED.value)
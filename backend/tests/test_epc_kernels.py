@@ -0,0 +1,232 @@
+import unittest
+import sys
+import os
+import tracemalloc
+from unittest import mock
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.epcis import GS1IdentifierValidator
+from backend.epcis import epc_kernels, event_validation
+from backend.epcis.event_validation import EPCISEventValidator
+from backend.epcis.epc_kernels import (
+    FORMAT_INVALID, FORMAT_VALID, FORMAT_UNDECIDED, PARALLEL_THRESHOLD, PREFIX_NONE, PREFIX_UNDECIDED,
+    company_prefix_spans, epc_formats_ok
+)
+
+# (epc, expected validate_epc_format result) for EPCs the kernel decides itself
+DECIDED_EPCS = [
+    ('urn:epc:id:sgtin:0327808.019001.100000001', True),
+    ('urn:epc:id:sgtin:0327808.019001.ABCdef0123456789wxyz', True),    # 20-character serial
+    ('urn:epc:id:sgtin:0327808.019001.ABCdef0123456789wxyz0', False),  # 21-character serial
+    ('urn:epc:id:sgtin:0327808.019001.1-2', False),
+    ('urn:epc:id:sgtin:0327808.019001', False),
+    ('urn:epc:id:sgtin:0327808.019001.', False),
+    ('urn:epc:id:sgtin:0327808..100000001', False),
+    ('urn:epc:id:sgtin:.019001.100000001', False),
+    ('urn:epc:id:sgtin:03278A8.019001.100000001', False),
+    ('urn:epc:id:sscc:0327808.0000000001', True),    # 17 digits
+    ('urn:epc:id:sscc:0327808.000000001', False),    # 16 digits
+    ('urn:epc:id:sscc:0327808.0000000001.1', False),
+    ('urn:epc:id:sgln:0614141.123452', True),        # correct check digit
+    ('urn:epc:id:sgln:0614141.123453', False),       # wrong check digit
+    ('urn:epc:id:sgln:0327808.00000.0', False),
+    ('urn:epc:id:grai:0614141.12345', True),
+    ('urn:epc:id:grai:0614141.12345.400', False),
+    ('urn:epc:id:giai:0614141.12345', True),
+    ('urn:epc:id:giai:0614141.A1', False),
+    ('urn:epc:id:upc:0614141.12345', False),
+    ('urn:epc:id:sgtinx:0327808.019001.1', False),
+    ('urn:epc:idx:sgtin:0327808.019001.1', False),
+    ('urn:epc:id:', False),
+    ('', False),
+]
+
+# EPCs the kernel must leave to GS1IdentifierValidator
+UNDECIDED_EPCS = [
+    'urn:epc:id:sgtin:0327808.019001.100000001\n',
+    'urn:epc:id:sscc:0327808.0000000001\n',
+    'urn:epc:id:sgtin:0327808.019001.10000000é',
+    'urn:epc:id:sscc:٠٣٢٧٨٠٨.0000000001',
+]
+
+
+class EPCFormatTestCase(unittest.TestCase):
+    """Shared checks for the compiled and numpy-only format checks"""
+
+    def assert_matches_validator(self, epcs, codes):
+        self.assertEqual(len(codes), len(epcs))
+        for epc, code in zip(epcs, codes):
+            if code == FORMAT_UNDECIDED:
+                continue
+            self.assertEqual(code == FORMAT_VALID, GS1IdentifierValidator.validate_epc_format(epc), repr(epc))
+
+    def assert_parallel_batch(self):
+        table = [epc for epc, _ in DECIDED_EPCS] + UNDECIDED_EPCS
+        epcs = (table * (PARALLEL_THRESHOLD // len(table) + 1))[:PARALLEL_THRESHOLD]
+        single = dict(zip(table, epc_formats_ok(table)))
+        codes = epc_formats_ok(epcs)
+        self.assertEqual(codes, [single[epc] for epc in epcs])
+        self.assert_matches_validator(epcs, codes)
+
+
+class TestEPCFormatKernel(EPCFormatTestCase):
+    """Test that the compiled EPC format check agrees with GS1IdentifierValidator"""
+
+    def setUp(self):
+        pytest.importorskip("numba")
+
+    def test_decided_epcs(self):
+        """Test valid and invalid EPCs of every scheme"""
+        epcs = [epc for epc, _ in DECIDED_EPCS]
+        codes = epc_formats_ok(epcs)
+        self.assertEqual(codes, [FORMAT_VALID if valid else FORMAT_INVALID for _, valid in DECIDED_EPCS])
+        self.assert_matches_validator(epcs, codes)
+
+    def test_undecided_epcs(self):
+        """Test that non-ASCII text and a trailing newline are left to the validator"""
+        self.assertEqual(epc_formats_ok(UNDECIDED_EPCS), [FORMAT_UNDECIDED] * len(UNDECIDED_EPCS))
+
+    def test_parallel_batch(self):
+        """Test a batch large enough for the parallel kernel"""
+        self.assert_parallel_batch()
+
+    def test_non_string_entry(self):
+        """Test that a batch with a non-string entry is not checked"""
+        self.assertIsNone(epc_formats_ok(['urn:epc:id:sscc:0327808.0000000001', None]))
+
+
+class TestCompanyPrefixSpans(unittest.TestCase):
+    """Test that the compiled prefix scan agrees with extract_company_prefix"""
+
+    def setUp(self):
+        pytest.importorskip("numba")
+
+    def test_spans_match_extract_company_prefix(self):
+        """Test that epc[start:end] is the prefix extract_company_prefix returns"""
+        # (epc, expected prefix) where the kernel decides the span itself
+        cases = [
+            ('urn:epc:id:sgtin:0327808.019001.100000001', '0327808'),
+            ('urn:epc:id:sscc:0327808.0000000001', '0327808'),
+            ('urn:epc:id:sgtin:0327808', '0327808'),              # no '.'
+            ('urn:epc:id:sgtin:0327808:extra.1', '0327808'),      # no '.' before the next ':'
+            ('urn:epc:id:sgtin:', ''),                            # empty fifth field
+            ('urn:epc:id:sgtin:.019001.1', ''),
+            ('urn:epc:id:sgtin:0327808.01900é.1', '0327808'),     # non-ASCII after the prefix
+            ('urn:epc:id:sgtin', None),                           # fewer than 4 colons
+            ('0327808.019001.1', None),
+            ('', None),
+        ]
+        spans = company_prefix_spans([epc for epc, _ in cases])
+        self.assertEqual(len(spans), len(cases))
+        for (epc, expected), (start, end) in zip(cases, spans):
+            self.assertEqual(GS1IdentifierValidator.extract_company_prefix(epc), expected, repr(epc))
+            if expected is None:
+                self.assertEqual(start, PREFIX_NONE, repr(epc))
+            else:
+                self.assertGreaterEqual(start, 0, repr(epc))
+                self.assertEqual(epc[start:end], expected, repr(epc))
+
+    def test_non_ascii_before_prefix_end_is_undecided(self):
+        """Test that byte offsets are not reported once they stop matching string indices"""
+        epcs = [
+            'urñ:epc:id:sgtin:0327808.019001.1',
+            'urn:epc:id:sgtin:03278é8.019001.1',
+            'urn:epc:id:sgtin:0327808é',
+        ]
+        self.assertEqual([start for start, _ in company_prefix_spans(epcs)], [PREFIX_UNDECIDED] * len(epcs))
+
+
+class TestEPCFormatNumpyFallback(EPCFormatTestCase):
+    """Test the numpy-only prefix check used when numba is not available"""
+
+    def setUp(self):
+        pytest.importorskip("numpy")
+        without_numba = mock.patch.object(epc_kernels, 'njit', None)
+        without_numba.start()
+        self.addCleanup(without_numba.stop)
+
+    def test_decided_epcs(self):
+        """Test that EPCs of every scheme are only rejected for a missing prefix"""
+        epcs = [epc for epc, _ in DECIDED_EPCS]
+        codes = epc_formats_ok(epcs)
+        self.assertEqual(codes, [FORMAT_UNDECIDED if epc.startswith('urn:epc:id:') else FORMAT_INVALID for epc in epcs])
+        self.assert_matches_validator(epcs, codes)
+
+    def test_undecided_epcs(self):
+        """Test that non-ASCII text and a trailing newline are left to the validator"""
+        self.assertEqual(epc_formats_ok(UNDECIDED_EPCS), [FORMAT_UNDECIDED] * len(UNDECIDED_EPCS))
+
+    def test_parallel_batch(self):
+        """Test a batch at the parallel kernel's threshold"""
+        self.assert_parallel_batch()
+
+    def test_company_prefix_spans_unavailable(self):
+        """Test that prefix extraction is left to extract_company_prefix"""
+        self.assertIsNone(company_prefix_spans(['urn:epc:id:sgtin:0327808.019001.100000001']))
+
+    def test_only_missing_prefix_is_decided(self):
+        """Test that only EPCs without the urn:epc:id: prefix are decided"""
+        epcs = [
+            'urn:epc:id:sgtin:0327808.019001.100000001',
+            'urn:epc:id:sgtin:0327808.019001',
+            'urn:epc:idx:sgtin:0327808.019001.1',
+            'urn:epc:id:sgtin:0327808.019001.10000000é',
+            '',
+        ]
+        codes = epc_formats_ok(epcs)
+        self.assertEqual(codes, [FORMAT_UNDECIDED, FORMAT_UNDECIDED, FORMAT_INVALID, FORMAT_UNDECIDED, FORMAT_INVALID])
+        for epc, code in zip(epcs, codes):
+            if code == FORMAT_INVALID:
+                self.assertFalse(GS1IdentifierValidator.validate_epc_format(epc))
+
+    def test_long_epc_in_large_batch(self):
+        """Test that one oversized EPC does not widen every entry of the batch"""
+        long_epc = 'urn:epc:id:sgtin:0327808.019001.' + '1' * 200000
+        epcs = ['urn:epc:id:sgtin:0327808.019001.100000001', 'urn:epc:idx:sgtin:1.2.3'] * (PARALLEL_THRESHOLD // 2)
+        epcs.append(long_epc)
+        tracemalloc.start()
+        try:
+            codes = epc_formats_ok(epcs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(codes, [FORMAT_UNDECIDED, FORMAT_INVALID] * (PARALLEL_THRESHOLD // 2) + [FORMAT_UNDECIDED])
+        # A fixed-width array of this batch would take over 3 GB
+        self.assertLess(peak, 50 * 1024 * 1024)
+
+
+class TestBulkEPCValidation(unittest.TestCase):
+    """Test that long EPC lists get the same errors on every code path"""
+
+    def setUp(self):
+        pytest.importorskip("numpy")
+        table = [epc for epc, _ in DECIDED_EPCS] + UNDECIDED_EPCS
+        self.event = {'epcList': table * 3}
+        self.authorized_companies = {'0614141'}
+        # The scalar per-EPC loop, used when numpy is not installed
+        with mock.patch.object(event_validation, 'np', None):
+            self.expected = self._errors()
+        self.assertTrue(self.expected)
+
+    def _errors(self):
+        errors = []
+        EPCISEventValidator()._validate_epcs(self.event, self.authorized_companies, errors)
+        return [(error['message'], error.get('line_number')) for error in errors]
+
+    def test_numpy_fallback(self):
+        """Test the default install, where numba is not available"""
+        with mock.patch.object(epc_kernels, 'njit', None):
+            self.assertEqual(self._errors(), self.expected)
+
+    def test_numba_kernels(self):
+        """Test the compiled kernels when numba is installed"""
+        pytest.importorskip("numba")
+        self.assertEqual(self._errors(), self.expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
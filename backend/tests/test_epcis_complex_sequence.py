@@ -5,7 +5,7 @@ import os
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from backend.epcis import EPCISValidator  # Updated import path
+from backend.epcis import EPCISValidator, EPCISParser, EPCISSequenceValidator  # Updated import path
 
 class TestEPCISComplexSequence(unittest.TestCase):
     """Test complex EPCIS sequence validation with multiple products and levels"""
@@ -213,5 +213,53 @@ class TestEPCISComplexSequence(unittest.TestCase):
         )
         self.assertTrue(has_packing_error, "Should report missing packing error")
 
+    def _sequence_errors(self, *events):
+        """Parse a document holding the given ObjectEvents and validate its sequence"""
+        document = (
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<epcis:EPCISDocument xmlns:epcis="urn:epcglobal:epcis:xsd:1" schemaVersion="1.2" '
+            'creationDate="2024-05-24T00:00:00Z"><EPCISBody><EventList>'
+            + ''.join(events) +
+            '</EventList></EPCISBody></epcis:EPCISDocument>'
+        )
+        _, parsed_events, _, parse_errors = EPCISParser.parse_document(document.encode(), is_xml=True)
+        self.assertEqual(parse_errors, [])
+        return EPCISSequenceValidator().validate_sequence(parsed_events)
+
+    def _object_event(self, event_time, action, biz_step, disposition):
+        return f"""
+            <ObjectEvent>
+                <eventTime>{event_time}</eventTime>
+                <eventTimeZoneOffset>+00:00</eventTimeZoneOffset>
+                <epcList>
+                    <epc>urn:epc:id:sgtin:0327808.019001.100000001</epc>
+                </epcList>
+                <action>{action}</action>
+                <bizStep>urn:epcglobal:cbv:bizstep:{biz_step}</bizStep>
+                <disposition>urn:epcglobal:cbv:disp:{disposition}</disposition>
+            </ObjectEvent>"""
+
+    def test_shipping_before_commissioning_in_document(self):
+        """Test that an SGTIN used before its commissioning event is reported"""
+        shipping = self._object_event('2024-05-24T00:00:03.000Z', 'OBSERVE', 'shipping', 'in_transit')
+        commissioning = self._object_event('2024-05-24T00:00:00.000Z', 'ADD', 'commissioning', 'active')
+
+        errors = self._sequence_errors(shipping, commissioning)
+        self.assertTrue(
+            any('not commissioned before shipping' in err['message'] for err in errors),
+            "Shipping ahead of the commissioning event should be reported"
+        )
+
+    def test_commissioning_before_shipping_in_document(self):
+        """Test that an SGTIN commissioned earlier in the document is accepted"""
+        commissioning = self._object_event('2024-05-24T00:00:00.000Z', 'ADD', 'commissioning', 'active')
+        shipping = self._object_event('2024-05-24T00:00:03.000Z', 'OBSERVE', 'shipping', 'in_transit')
+
+        errors = self._sequence_errors(commissioning, shipping)
+        self.assertFalse(
+            any('not commissioned' in err['message'] for err in errors),
+            "Commissioning ahead of shipping should not be reported"
+        )
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
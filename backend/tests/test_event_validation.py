@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.epcis import EPCISEventValidator
+from backend.epcis.event_validation import _fast_check_event_time
+
+# (eventTime, whether it is accepted), as the strptime formats decide it
+EVENT_TIMES = [
+    ('2024-05-24T00:00:00Z', True),
+    ('2024-05-24T00:00:00.1Z', True),
+    ('2024-05-24T00:00:00.123456Z', True),
+    ('2024-05-24T00:00:00.1234567Z', False),
+    ('2024-02-30T00:00:00Z', False),
+    ('2024-05-24T00:00:00', False),
+    ('2024-05-24 00:00:00Z', False),
+    # isdigit() accepts these, strptime's %f does not
+    ('2024-05-24T00:00:00.²Z', False),
+    ('2024-05-24T00:00:00.٠١Z', False),
+    # strptime's \d matches Unicode digits outside the fraction
+    ('٢٠٢٤-05-24T00:00:00Z', True),
+]
+
+
+def _strptime_accepts(value):
+    for fmt in ("%Y-%m-%dT%H:%M:%S.%fZ", "%Y-%m-%dT%H:%M:%SZ"):
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            pass
+    return False
+
+
+class TestEventTimeValidation(unittest.TestCase):
+    """Test eventTime validation and its strptime fast path"""
+
+    def test_fast_path_never_accepts_what_strptime_rejects(self):
+        for value, _ in EVENT_TIMES:
+            with self.subTest(value=value):
+                if _fast_check_event_time(value):
+                    self.assertTrue(_strptime_accepts(value))
+
+    def test_event_time_errors(self):
+        validator = EPCISEventValidator()
+        for value, accepted in EVENT_TIMES:
+            with self.subTest(value=value):
+                self.assertEqual(_strptime_accepts(value), accepted)
+                errors = []
+                validator._validate_event_time({'eventTime': value}, errors)
+                has_error = any('Invalid eventTime format' in err['message'] for err in errors)
+                self.assertEqual(has_error, not accepted)
+
+
+if __name__ == '__main__':
+    unittest.main()
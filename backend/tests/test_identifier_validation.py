@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.epcis import GS1IdentifierValidator
+
+# (epc, validate_epc_format, get_epc_type, classify_epc), as the former
+# EPC_PATTERNS regexes classified them unless noted otherwise
+EPC_CASES = [
+    # sgtin: <CompanyPrefix>.<ItemReference>.<1-20 alphanumeric serial>
+    ('urn:epc:id:sgtin:0327808.019001.100000001', True, 'sgtin', 'sgtin'),
+    ('urn:epc:id:sgtin:0327808.019001.ABCdef0123456789wxyz', True, 'sgtin', 'sgtin'),
+    ('urn:epc:id:sgtin:0327808.019001.ABCdef0123456789wxyz0', False, None, None),
+    ('urn:epc:id:sgtin:0327808.019001.', False, None, None),
+    ('urn:epc:id:sgtin:0327808..100000001', False, None, None),
+    ('urn:epc:id:sgtin:.019001.100000001', False, None, None),
+    ('urn:epc:id:sgtin:0327808.019001.1000.1', False, None, None),
+    ('urn:epc:id:sgtin:0327808.019001', False, None, None),
+    # sscc: 17 digits in total
+    ('urn:epc:id:sscc:0327808.0000000001', True, 'sscc', 'sscc'),
+    ('urn:epc:id:sscc:0327808.000000001', False, 'sscc', None),
+    ('urn:epc:id:sscc:0327808.', False, None, None),
+    ('urn:epc:id:sscc:0327808.0000000001.1', False, None, None),
+    # sgln: GLN check digit
+    ('urn:epc:id:sgln:0614141.123452', True, 'sgln', 'sgln'),
+    ('urn:epc:id:sgln:0614141.123453', False, 'sgln', None),
+    ('urn:epc:id:sgln:0614141.12345.0', False, None, None),
+    # grai / giai
+    ('urn:epc:id:grai:0614141.12345', True, 'grai', 'grai'),
+    ('urn:epc:id:grai:.12345', False, None, None),
+    ('urn:epc:id:grai:0614141.12345.400', False, None, None),
+    ('urn:epc:id:giai:0614141.12345', True, 'giai', 'giai'),
+    # '$' matched before one trailing newline, so the scanner accepts it too
+    ('urn:epc:id:sgtin:0327808.019001.100000001\n', True, 'sgtin', 'sgtin'),
+    ('urn:epc:id:sscc:0327808.0000000001\n', True, 'sscc', 'sscc'),
+    ('urn:epc:id:giai:0614141.12345\n', True, 'giai', 'giai'),
+    ('urn:epc:id:sgtin:0327808.019001.100000001\n\n', False, None, None),
+    # Unknown schemes and malformed prefixes
+    ('urn:epc:id:upc:0614141.12345', False, None, None),
+    ('urn:epc:id:sgtin0327808.019001.1', False, None, None),
+    ('urn:epc:idx:sgtin:0327808.019001.1', False, None, None),
+    ('urn:epc:id:', False, None, None),
+    ('', False, None, None),
+    # Unicode digits matched the old \d but are not valid in an EPC URN
+    ('urn:epc:id:sscc:٠٣٢٧٨٠٨.0000000001', False, None, None),
+    ('urn:epc:id:sgtin:0327808.０１９００１.100000001', False, None, None),
+]
+
+
+class TestEPCClassification(unittest.TestCase):
+    """Test EPC format validation and type detection"""
+
+    def test_validate_epc_format(self):
+        for epc, valid, _, _ in EPC_CASES:
+            with self.subTest(epc=epc):
+                self.assertEqual(GS1IdentifierValidator.validate_epc_format(epc), valid)
+
+    def test_get_epc_type(self):
+        for epc, _, epc_type, _ in EPC_CASES:
+            with self.subTest(epc=epc):
+                self.assertEqual(GS1IdentifierValidator.get_epc_type(epc), epc_type)
+
+    def test_classify_epc(self):
+        for epc, _, _, classified in EPC_CASES:
+            with self.subTest(epc=epc):
+                self.assertEqual(GS1IdentifierValidator.classify_epc(epc), classified)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import unittest
+import sys
+import os
+from unittest import mock
+
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.epcis.storage_handlers import S3StorageHandler
+
+
+class TestS3PresignedURLs(unittest.TestCase):
+    """Test reuse of presigned S3 download URLs"""
+
+    def setUp(self):
+        pytest.importorskip("boto3")
+
+    def _handler(self, **config):
+        handler = S3StorageHandler({'bucket_name': 'epcis-bucket', 'region': 'us-east-1', **config})
+        # Signing is local, but a mock shows how often it happens
+        handler.s3_client = mock.Mock()
+        handler.s3_client.generate_presigned_url.return_value = 'https://epcis-bucket.s3.amazonaws.com/signed'
+        return handler
+
+    def test_configured_keys_reuse_url(self):
+        """Test that static keys let a URL be reused within its window"""
+        handler = self._handler(aws_access_key='AKIAEXAMPLE', aws_secret_key='secret')
+        for _ in range(3):
+            handler.generate_presigned_url('s3://epcis-bucket/epcis/VENDOR/file.xml')
+        self.assertEqual(handler.s3_client.generate_presigned_url.call_count, 1)
+
+    def test_default_credentials_sign_every_call(self):
+        """Test that possibly temporary credentials are never reused from the cache"""
+        handler = self._handler()
+        for _ in range(3):
+            handler.generate_presigned_url('s3://epcis-bucket/epcis/VENDOR/file.xml')
+        self.assertEqual(handler.s3_client.generate_presigned_url.call_count, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
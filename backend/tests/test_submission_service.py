@@ -0,0 +1,117 @@
+import unittest
+import asyncio
+import os
+import threading
+import sys
+import tempfile
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backend.models.base import Base
+from backend.models.epcis_submission import EPCISSubmission
+from backend.models.supplier import Supplier
+from backend.epcis.storage_handlers import LocalStorageHandler
+from backend.epcis.submission_service import SubmissionService
+
+
+SAMPLE_EPCIS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<epcis:EPCISDocument xmlns:epcis="urn:epcglobal:epcis:xsd:1" schemaVersion="1.2" creationDate="2024-05-24T00:00:00Z">
+    <EPCISBody>
+        <EventList>
+            <ObjectEvent>
+                <eventTime>2024-05-24T00:00:00.000Z</eventTime>
+                <eventTimeZoneOffset>+00:00</eventTimeZoneOffset>
+                <epcList>
+                    <epc>urn:epc:id:sgtin:0327808.019001.100000001</epc>
+                </epcList>
+                <action>ADD</action>
+                <bizStep>urn:epcglobal:cbv:bizstep:commissioning</bizStep>
+                <disposition>urn:epcglobal:cbv:disp:active</disposition>
+            </ObjectEvent>
+        </EventList>
+    </EPCISBody>
+</epcis:EPCISDocument>"""
+
+
+class TestConcurrentSubmissions(unittest.TestCase):
+    """Test duplicate detection for uploads processed at the same time"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        engine = create_engine(f"sqlite:///{os.path.join(self.temp_dir.name, 'submissions.db')}")
+        Base.metadata.create_all(bind=engine)
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        self.addCleanup(engine.dispose)
+
+        db = self.session_factory()
+        db.add(Supplier(id='TESTVENDOR', name='TESTVENDOR'))
+        db.commit()
+        db.close()
+
+        self.service = SubmissionService()
+        self.service.storage = LocalStorageHandler({'base_path': os.path.join(self.temp_dir.name, 'storage')})
+
+    def _process_concurrently(self, *uploads):
+        async def run():
+            return await asyncio.gather(*(
+                self.service.process_submission(content, file_name, 'TESTVENDOR')
+                for content, file_name in uploads
+            ))
+        with patch('backend.epcis.submission_service.SessionLocal', self.session_factory):
+            return asyncio.run(run())
+
+    def _stored_submissions(self):
+        db = self.session_factory()
+        try:
+            return db.query(EPCISSubmission).count()
+        finally:
+            db.close()
+
+    def test_identical_uploads(self):
+        """Test that only one of two identical concurrent uploads is stored"""
+        content = SAMPLE_EPCIS_XML.encode()
+        results = self._process_concurrently((content, 'EPCIS_TESTVENDOR_1.xml'), (content, 'EPCIS_TESTVENDOR_1.xml'))
+
+        self.assertEqual(sorted(result['status_code'] for result in results), [200, 409])
+        duplicate = next(result for result in results if result['status_code'] == 409)
+        self.assertEqual(duplicate['message'], 'Duplicate submission detected')
+        self.assertEqual(duplicate['detail']['duplicate_type'], 'content_hash')
+        self.assertEqual(self._stored_submissions(), 1)
+
+    def test_identical_uploads_from_two_event_loops(self):
+        """Test an upload racing one from the file watcher, which runs its own event loop"""
+        content = SAMPLE_EPCIS_XML.encode()
+        results = []
+
+        def upload():
+            results.append(asyncio.run(self.service.process_submission(content, 'EPCIS_TESTVENDOR_1.xml', 'TESTVENDOR')))
+
+        with patch('backend.epcis.submission_service.SessionLocal', self.session_factory):
+            threads = [threading.Thread(target=upload) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(sorted(result['status_code'] for result in results), [200, 409])
+        self.assertEqual(self._stored_submissions(), 1)
+
+    def test_different_uploads(self):
+        """Test that concurrent uploads of different documents are both stored"""
+        results = self._process_concurrently(
+            (SAMPLE_EPCIS_XML.encode(), 'EPCIS_TESTVENDOR_1.xml'),
+            (SAMPLE_EPCIS_XML.replace('100000001', '100000002').encode(), 'EPCIS_TESTVENDOR_2.xml'),
+        )
+
+        self.assertEqual([result['status_code'] for result in results], [200, 200])
+        self.assertEqual(self._stored_submissions(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
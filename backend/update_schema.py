@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 """
-One-time migration script to add missing columns to the tables.
+One-time migration script to add missing columns and indexes to the tables.
 This fixes the 'no such column: epcis_submissions.valid_submission_id', 'no such column: suppliers.status' 
 and 'no such column: validation_errors.line_number' errors.
 """
@@ -65,6 +65,12 @@ def add_missing_columns(db_path):
         else:
             logger.info(f"Column line_number already exists in validation_errors table in {db_path}")
         
+        # Index the duplicate-submission lookups (named as SQLAlchemy's index=True does)
+        logger.info(f"Ensuring file_hash index on epcis_submissions table in {db_path}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_epcis_submissions_file_hash ON epcis_submissions (file_hash)")
+        logger.info(f"Ensuring instance_identifier index on epcis_submissions table in {db_path}")
+        cursor.execute("CREATE INDEX IF NOT EXISTS ix_epcis_submissions_instance_identifier ON epcis_submissions (instance_identifier)")
+        
         # Commit changes and close connection
         conn.commit()
         logger.info(f"Schema update completed successfully for {db_path}")
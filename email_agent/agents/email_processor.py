@@ -11,6 +11,44 @@ from email_agent.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Extraction patterns, compiled once and tried in order
+_PO_NUMBER_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'PO[:#\s]*([A-Z0-9-]{5,15})',
+    r'Purchase\s+Order[:#\s]*([A-Z0-9-]{5,15})',
+    r'P\.O\.[:#\s]*([A-Z0-9-]{5,15})',
+    r'Order\s+Number[:#\s]*([A-Z0-9-]{5,15})',
+    r'bizTransaction[^>]*>([^<]*PO[^<]*)',
+    r'urn:epcglobal:cbv:bt:[^:]*:([A-Z0-9-]+)'
+))
+_LOT_NUMBER_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'LOT[:#\s]*([A-Z0-9-]{3,20})',
+    r'Lot\s+Number[:#\s]*([A-Z0-9-]{3,20})',
+    r'Batch[:#\s]*([A-Z0-9-]{3,20})',
+    r'lotNumber[\">:\s]*([A-Z0-9-]{3,20})',
+    r'<lotNumber>([^<]+)</lotNumber>',
+    r'"lotNumber"[:\s]*"([^"]+)"'
+))
+_ERROR_DETAIL_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE | re.DOTALL) for pattern in (
+    r'Error[s]?[:\s]+(.*?)(?:\n\n|\Z)',
+    r'Validation\s+(?:Error|Failed)[:\s]+(.*?)(?:\n\n|\Z)',
+    r'Invalid[:\s]+(.*?)(?:\n\n|\Z)',
+    r'Missing[:\s]+(.*?)(?:\n\n|\Z)',
+    r'Failed[:\s]+(.*?)(?:\n\n|\Z)'
+))
+_SUBMISSION_ID_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'Submission\s+ID[:\s]*([a-f0-9-]{36})',
+    r'ID[:\s]*([a-f0-9-]{36})',
+    r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})'
+))
+_FILE_NAME_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'File[:\s]+([A-Za-z0-9_.-]+\.(?:xml|json))',
+    r'Filename[:\s]+([A-Za-z0-9_.-]+\.(?:xml|json))',
+    r'([A-Za-z0-9_.-]+\.(?:xml|json))'
+))
+_NON_WORD_RE = re.compile(r'[^\w-]')
+_ANGLE_EMAIL_RE = re.compile(r'<([^>]*)>')
+_EMAIL_DOMAIN_RE = re.compile(r'@([^.>]+)')
+
 class EmailProcessorAgent:
     """AI Agent for processing and extracting data from emails"""
     
@@ -120,20 +158,11 @@ Be thorough and accurate in your extraction."""),
     
     def _extract_po_numbers(self, text: str) -> List[str]:
         """Extract PO numbers from text"""
-        patterns = [
-            r'PO[:#\s]*([A-Z0-9-]{5,15})',
-            r'Purchase\s+Order[:#\s]*([A-Z0-9-]{5,15})',
-            r'P\.O\.[:#\s]*([A-Z0-9-]{5,15})',
-            r'Order\s+Number[:#\s]*([A-Z0-9-]{5,15})',
-            r'bizTransaction[^>]*>([^<]*PO[^<]*)',
-            r'urn:epcglobal:cbv:bt:[^:]*:([A-Z0-9-]+)'
-        ]
-        
         po_numbers = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _PO_NUMBER_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
-                cleaned = re.sub(r'[^\w-]', '', match).upper()
+                cleaned = _NON_WORD_RE.sub('', match).upper()
                 if len(cleaned) >= 5 and cleaned not in po_numbers:
                     po_numbers.append(cleaned)
         
@@ -142,20 +171,11 @@ Be thorough and accurate in your extraction."""),
     
     def _extract_lot_numbers(self, text: str) -> List[str]:
         """Extract LOT numbers from text"""
-        patterns = [
-            r'LOT[:#\s]*([A-Z0-9-]{3,20})',
-            r'Lot\s+Number[:#\s]*([A-Z0-9-]{3,20})',
-            r'Batch[:#\s]*([A-Z0-9-]{3,20})',
-            r'lotNumber[\">:\s]*([A-Z0-9-]{3,20})',
-            r'<lotNumber>([^<]+)</lotNumber>',
-            r'"lotNumber"[:\s]*"([^"]+)"'
-        ]
-        
         lot_numbers = []
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
+        for pattern in _LOT_NUMBER_PATTERNS:
+            matches = pattern.findall(text)
             for match in matches:
-                cleaned = re.sub(r'[^\w-]', '', match).upper()
+                cleaned = _NON_WORD_RE.sub('', match).upper()
                 if len(cleaned) >= 3 and cleaned not in lot_numbers:
                     lot_numbers.append(cleaned)
         
@@ -199,13 +219,13 @@ Be thorough and accurate in your extraction."""),
 
     def _extract_vendor_info(self, text: str, sender_email: str) -> Tuple[Optional[str], str]:
     # Ensure we only capture the actual email address
-        email_match = re.search(r'<([^>]*)>', sender_email)
+        email_match = _ANGLE_EMAIL_RE.search(sender_email)
         if email_match:
             parsed_email = email_match.group(1)
         else:
             parsed_email = sender_email
         
-        domain_match = re.search(r'@([^.>]+)', parsed_email)
+        domain_match = _EMAIL_DOMAIN_RE.search(parsed_email)
         if domain_match:
             vendor_name = domain_match.group(1).replace('-', ' ').title()
             return vendor_name, parsed_email
@@ -214,16 +234,8 @@ Be thorough and accurate in your extraction."""),
 
     def _extract_error_details(self, text: str) -> Optional[str]:
         """Extract error descriptions from text"""
-        error_patterns = [
-            r'Error[s]?[:\s]+(.*?)(?:\n\n|\Z)',
-            r'Validation\s+(?:Error|Failed)[:\s]+(.*?)(?:\n\n|\Z)',
-            r'Invalid[:\s]+(.*?)(?:\n\n|\Z)',
-            r'Missing[:\s]+(.*?)(?:\n\n|\Z)',
-            r'Failed[:\s]+(.*?)(?:\n\n|\Z)'
-        ]
-        
-        for pattern in error_patterns:
-            match = re.search(pattern, text, re.IGNORECASE | re.DOTALL)
+        for pattern in _ERROR_DETAIL_PATTERNS:
+            match = pattern.search(text)
             if match:
                 error_desc = match.group(1).strip()
                 if len(error_desc) > 10:
@@ -233,14 +245,8 @@ Be thorough and accurate in your extraction."""),
     
     def _extract_submission_id(self, text: str) -> Optional[str]:
         """Extract submission ID from text"""
-        patterns = [
-            r'Submission\s+ID[:\s]*([a-f0-9-]{36})',
-            r'ID[:\s]*([a-f0-9-]{36})',
-            r'([a-f0-9]{8}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{4}-[a-f0-9]{12})'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _SUBMISSION_ID_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
@@ -248,14 +254,8 @@ Be thorough and accurate in your extraction."""),
     
     def _extract_file_name(self, text: str) -> Optional[str]:
         """Extract file name from text"""
-        patterns = [
-            r'File[:\s]+([A-Za-z0-9_.-]+\.(?:xml|json))',
-            r'Filename[:\s]+([A-Za-z0-9_.-]+\.(?:xml|json))',
-            r'([A-Za-z0-9_.-]+\.(?:xml|json))'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _FILE_NAME_PATTERNS:
+            match = pattern.search(text)
             if match:
                 return match.group(1)
         
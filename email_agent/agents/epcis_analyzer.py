@@ -8,6 +8,7 @@ from typing import List, Dict, Any
 from backend.epcis.event_validation import EPCISEventValidator
 from backend.epcis.parser import EPCISParser
 from backend.epcis.sequence_validation import EPCISSequenceValidator
+from backend.epcis.utils import loads_json
 # backend_path = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'backend')
 # sys.path.insert(0, backend_path)
 # Add the parent directory to path to access backend modules
@@ -178,7 +179,7 @@ Provide detailed, actionable recommendations for each error found."""),
             
             if file_path.endswith('.json'):
                 # Parse JSON format
-                data = json.loads(content)
+                data = loads_json(content)
                 if 'epcisBody' in data and 'eventList' in data['epcisBody']:
                     events = data['epcisBody']['eventList']
                 elif 'events' in data:
@@ -204,7 +205,7 @@ Provide detailed, actionable recommendations for each error found."""),
         try:
             events = []
             if content_type == 'json':
-                data = json.loads(content)
+                data = loads_json(content)
                 if 'epcisBody' in data and 'eventList' in data['epcisBody']:
                     events = data['epcisBody']['eventList']
                 elif 'events' in data: